@@ -0,0 +1,138 @@
+"""
+Benchmark for the local hashtag index.
+Measures suggestion latency and the overlap of the index's picks with reference
+hashtags on a fixed corpus. With --live the reference picks come from hashtag_agent
+itself (requires GOOGLE_API_KEY); otherwise the curated picks stored in the corpus
+are used.
+
+Usage:
+    python -m benchmarks.hashtag_engine [--live] [--iterations 200]
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import importlib.util
+from typing import Dict, Any, List
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "hashtag_corpus.json")
+INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "linkedin_post_agent",
+    "sub_agents",
+    "hashtag_agent",
+    "hashtag_index.py",
+)
+
+
+def _load_index_module():
+    """
+    Loads hashtag_index.py by path. Importing it through the linkedin_post_agent package
+    would load the image tool, which needs Cloudinary and Gemini credentials.
+    """
+    spec = importlib.util.spec_from_file_location("hashtag_index", INDEX_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _llm_hashtags(text: str) -> List[str]:
+    """Asks hashtag_agent for hashtags, bypassing the local fast path."""
+    os.environ["HASHTAG_ENGINE_MODE"] = "llm"
+
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from linkedin_post_agent.sub_agents.hashtag_agent import hashtag_agent
+
+    session_service = InMemorySessionService()
+    runner = Runner(
+        agent=hashtag_agent, app_name="hashtag_bench", session_service=session_service
+    )
+    session = await session_service.create_session(
+        app_name="hashtag_bench", user_id="bench"
+    )
+    reply = ""
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        if event.content and event.content.parts:
+            reply += "".join(part.text or "" for part in event.content.parts)
+    return re.findall(r"#\w+", reply)
+
+
+def run(iterations: int, live: bool) -> Dict[str, Any]:
+    with open(CORPUS_PATH, "r") as f:
+        corpus = json.load(f)
+
+    start = time.perf_counter()
+    index = _load_index_module().HashtagIndex.from_file()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies_ms = []
+    overlaps = []
+    for item in corpus:
+        text = f"{item['topic']}\n{item['story']}"
+        for _ in range(iterations):
+            start = time.perf_counter()
+            suggestion = index.suggest(text)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        reference = (
+            asyncio.run(_llm_hashtags(text)) if live else item["reference_hashtags"]
+        )
+        picked = {tag.lower() for tag in suggestion["hashtags"]}
+        expected = {tag.lower() for tag in reference}
+        overlaps.append(
+            {
+                "topic": item["topic"],
+                "local": suggestion["hashtags"],
+                "reference": reference,
+                "confidence": suggestion["confidence"],
+                "shared": len(picked & expected),
+                "jaccard": (
+                    len(picked & expected) / len(picked | expected)
+                    if picked | expected
+                    else 1.0
+                ),
+            }
+        )
+
+    return {
+        "vocabulary_size": len(index),
+        "build_ms": round(build_ms, 3),
+        "latency_ms": {
+            "p50": round(_percentile(latencies_ms, 50), 4),
+            "p95": round(_percentile(latencies_ms, 95), 4),
+            "p99": round(_percentile(latencies_ms, 99), 4),
+            "mean": round(statistics.mean(latencies_ms), 4),
+        },
+        "mean_jaccard": round(statistics.mean(o["jaccard"] for o in overlaps), 3),
+        "mean_shared": round(statistics.mean(o["shared"] for o in overlaps), 2),
+        "reference_source": "hashtag_agent" if live else "corpus",
+        "items": overlaps,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local hashtag index.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Compare against hashtag_agent instead of the curated reference picks.",
+    )
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations, args.live), indent=2))
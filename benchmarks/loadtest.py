@@ -0,0 +1,499 @@
+"""
+HTTP load generator for the A2A server.
+Drives /run with simulated multi-turn users (intent -> story confirm -> hashtags ->
+post -> optional image) arriving at a configurable rate, and reports throughput,
+per-phase latency percentiles, error rates and server RSS over time.
+
+By default the server runs in a child process with a fake model and a fake image
+uploader, so no API keys are needed and no quota is spent, and the load generator
+doesn't share an event loop, CPU time or memory with the server it measures. Pass
+--target to load an already running server instead.
+
+Usage:
+    python -m benchmarks.loadtest --users 200 --rate 10 --seed 42
+    python -m benchmarks.loadtest --target http://127.0.0.1:8003 --server-pid 1234
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import statistics
+import multiprocessing
+from collections import defaultdict
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+import httpx
+
+
+# Scripted user messages for each phase, in conversation order
+PHASE_MESSAGES = {
+    "intent": "I want to write a post about {topic}. {details}",
+    "story": "Looks good, I confirm the story.",
+    "hashtags": "I confirm the hashtags.",
+    "post": "I confirm the post.",
+    "image": "Yes, please generate an image.",
+    "no_image": "No image, thanks.",
+}
+
+TOPICS = [
+    ("my promotion to engineering manager", "I lead a team of six developers now."),
+    ("our startup's seed round", "We are hiring our first engineers."),
+    ("passing the AWS certification", "I studied for three months."),
+    ("my first conference talk", "It was about data pipelines with Spark."),
+    ("a multi agent system I built", "It uses Python, FastAPI and Gemini."),
+]
+
+# Placeholder 1x1 PNG returned by the fake image model
+FAKE_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def read_rss_bytes(pid: int) -> Optional[int]:
+    """Returns the resident set size of a process, or None when it can't be read."""
+    try:
+        import psutil
+
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def install_fakes(model_latency: float, image_latency: float):
+    """
+    Replaces the Gemini models and the Cloudinary uploader with in-process fakes.
+
+    Must run before anything imports linkedin_post_agent, because the image tool
+    checks its credentials at import time.
+
+    Returns:
+        The root agent, whose routed models now resolve to the fake model.
+    """
+    for var in (
+        "GOOGLE_API_KEY",
+        "CLOUDINARY_CLOUD_NAME",
+        "CLOUDINARY_API_KEY",
+        "CLOUDINARY_API_SECRET",
+    ):
+        os.environ.setdefault(var, "loadtest")
+
+    from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+    from google.genai import types
+
+    from linkedin_post_agent.agent import root_agent
+    from linkedin_post_agent.model_router import get_model_router
+    from linkedin_post_agent.sub_agents.image_agent.tools import (
+        create_image as create_image_module,
+    )
+
+    # Which agent produces the answer for the latest scripted user message
+    phase_agents = [
+        ("write a post about", "story_agent"),
+        ("confirm the story", "hashtag_agent"),
+        ("confirm the hashtags", "post_agent"),
+        ("confirm the post", "linkedin_post_agent"),
+        ("generate an image", "image_agent"),
+        ("no image", "linkedin_post_agent"),
+    ]
+    replies = {
+        "story_agent": "Last spring I faced exactly this moment. " * 12,
+        "hashtag_agent": "#Leadership #CareerGrowth #SoftwareEngineering #Teamwork",
+        "post_agent": "Here is your LinkedIn post.\n\n"
+        + "A short lesson learned. " * 20,
+        "linkedin_post_agent": "Would you like me to generate an image for the post?",
+        "image_agent": "Here is your image: <https://example.com/linkedin_post_image.png>",
+    }
+
+    class FakeLlm(BaseLlm):
+        """Scripted model that follows the five-phase flow without calling Gemini."""
+
+        latency: float = 0.0
+
+        @classmethod
+        def supported_models(cls) -> List[str]:
+            return [r"fake-.*"]
+
+        async def generate_content_async(
+            self, llm_request: LlmRequest, stream: bool = False
+        ) -> AsyncGenerator[LlmResponse, None]:
+            if self.latency:
+                await asyncio.sleep(random.expovariate(1 / self.latency))
+
+            instruction = str(llm_request.config.system_instruction or "")
+            match = re.search(r'internal name is "([^"]+)"', instruction)
+            agent_name = match.group(1) if match else "linkedin_post_agent"
+
+            last_parts = llm_request.contents[-1].parts if llm_request.contents else []
+            tool_result = any(
+                part.function_response
+                and part.function_response.name != "transfer_to_agent"
+                for part in last_parts or []
+            )
+
+            user_text = ""
+            for content in reversed(llm_request.contents):
+                texts = [part.text for part in content.parts or [] if part.text]
+                if content.role == "user" and texts:
+                    if not texts[0].startswith("For context:"):
+                        user_text = texts[0].lower()
+                        break
+            target = next(
+                (agent for marker, agent in phase_agents if marker in user_text),
+                "linkedin_post_agent",
+            )
+
+            if tool_result:
+                part = types.Part(text=replies[agent_name])
+            elif agent_name != target:
+                part = types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": target}
+                    )
+                )
+            elif agent_name == "image_agent":
+                part = types.Part(
+                    function_call=types.FunctionCall(
+                        name="create_image",
+                        args={"prompt": "A team celebrating at golden hour, 4K"},
+                    )
+                )
+            elif "no image" in user_text:
+                part = types.Part(text=replies["post_agent"])
+            else:
+                part = types.Part(text=replies[agent_name])
+            yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+    class FakeModels:
+        def generate_content(self, model: str, contents: Any, config: Any = None):
+            # Blocking on purpose: the real client call in create_image is synchronous
+            if image_latency:
+                time.sleep(image_latency)
+            return types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            role="model",
+                            parts=[
+                                types.Part(
+                                    inline_data=types.Blob(
+                                        data=FAKE_PNG, mime_type="image/png"
+                                    )
+                                )
+                            ],
+                        )
+                    )
+                ]
+            )
+
+    class FakeClient:
+        models = FakeModels()
+
+    def fake_upload(
+        image_data: bytes, public_id: str, folder: str = "linkedin_post_agent"
+    ):
+        return {
+            "status": "success",
+            "message": "Image uploaded successfully.",
+            "data": {
+                "url": f"https://example.com/{folder}/{public_id}.png",
+                "public_id": f"{folder}/{public_id}",
+                "format": "png",
+                "version": 1,
+            },
+        }
+
+    create_image_module.client = FakeClient()
+    create_image_module.upload_image_to_cloudinary = fake_upload
+
+    # Route every model name to the fake, so model routing stays in the loop
+    fake_llm = FakeLlm(model="fake-llm", latency=model_latency)
+    get_model_router().llm_factory = lambda model: fake_llm
+    return root_agent
+
+
+def _serve_with_fakes(
+    port: int, model_latency: float, image_latency: float, seed: Optional[int]
+) -> None:
+    """Runs the A2A server with fakes. Entry point of the server child process."""
+    import uvicorn
+
+    if seed is not None:
+        random.seed(seed)
+    root_agent = install_fakes(model_latency, image_latency)
+
+    from linkedin_post_agent.task_manager import TaskManager
+    from common.a2a_server import create_agent_server
+
+    app = create_agent_server(
+        name="LinkedIn Post Generator",
+        description="Agent for generating LinkedIn posts and images (load test)",
+        task_manager=TaskManager(
+            agent=root_agent,
+            snapshot_dir=os.getenv("SESSION_SNAPSHOT_DIR") or None,
+            snapshot_interval_s=float(os.getenv("SESSION_SNAPSHOT_INTERVAL_S", 30)),
+        ),
+    )
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+async def start_server_process(args) -> tuple:
+    """
+    Starts the A2A server with fakes in a child process on a free local port.
+
+    Returns:
+        tuple: The server's base URL and its process.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    # Spawn rather than fork, so the child starts from a clean interpreter
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve_with_fakes,
+        args=(port, args.model_latency, args.image_latency, args.seed),
+        name="loadtest-server",
+    )
+    process.start()
+
+    deadline = time.monotonic() + 60
+    while True:
+        if not process.is_alive():
+            raise RuntimeError(f"Server process exited with code {process.exitcode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Server process did not start within 60 s")
+            await asyncio.sleep(0.1)
+    return f"http://127.0.0.1:{port}", process
+
+
+async def stop_server_process(process) -> None:
+    """Stops the server child process gracefully, so its shutdown hooks run."""
+    process.terminate()
+    await asyncio.to_thread(process.join, 30)
+    if process.is_alive():
+        process.kill()
+        await asyncio.to_thread(process.join)
+
+
+class LoadStats:
+    """Collects per-phase latencies and errors during a run."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: List[str] = []
+        self.rss_samples: List[Dict[str, Any]] = []
+        self.completed_users = 0
+
+    def record_error(self, phase: str, detail: str) -> None:
+        self.errors[phase] += 1
+        if len(self.error_samples) < 10:
+            self.error_samples.append(f"{phase}: {detail}")
+
+
+async def simulate_user(
+    client: httpx.AsyncClient, args, stats: LoadStats, user_index: int
+) -> None:
+    """Plays one multi-turn conversation against /run."""
+    topic, details = random.choice(TOPICS)
+    phases = ["intent", "story", "hashtags", "post"]
+    phases.append("image" if random.random() < args.image_ratio else "no_image")
+
+    session_id = None
+    context = {"user_id": f"loadtest-{user_index}-{uuid.uuid4().hex[:6]}"}
+    for phase in phases:
+        message = PHASE_MESSAGES[phase].format(topic=topic, details=details)
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                "/run",
+                json={"message": message, "context": context, "session_id": session_id},
+            )
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                stats.record_error(phase, f"HTTP {response.status_code}")
+                return
+            body = response.json()
+            if body.get("status") != "success":
+                stats.record_error(phase, body.get("message", "unknown error")[:200])
+                return
+        except httpx.HTTPError as e:
+            stats.record_error(phase, f"{type(e).__name__}: {e}")
+            return
+
+        stats.latencies[phase].append(elapsed)
+        session_id = body.get("session_id") or session_id
+        if args.think_time:
+            await asyncio.sleep(random.expovariate(1 / args.think_time))
+    stats.completed_users += 1
+
+
+async def sample_rss(pid: int, stats: LoadStats, interval: float, started: float):
+    while True:
+        rss = read_rss_bytes(pid)
+        if rss is not None:
+            stats.rss_samples.append(
+                {
+                    "t": round(time.perf_counter() - started, 2),
+                    "rss_mb": round(rss / 1024 / 1024, 1),
+                }
+            )
+        await asyncio.sleep(interval)
+
+
+def build_report(stats: LoadStats, duration: float, users: int) -> Dict[str, Any]:
+    total_requests = sum(len(values) for values in stats.latencies.values())
+    total_errors = sum(stats.errors.values())
+    phases = {}
+    for phase in PHASE_MESSAGES:
+        values = stats.latencies.get(phase, [])
+        errors = stats.errors.get(phase, 0)
+        if not values and not errors:
+            continue
+        phases[phase] = {
+            "requests": len(values) + errors,
+            "errors": errors,
+            "error_rate": round(errors / (len(values) + errors), 4),
+            "p50_ms": round(_percentile(values, 50) * 1000, 1) if values else None,
+            "p95_ms": round(_percentile(values, 95) * 1000, 1) if values else None,
+            "p99_ms": round(_percentile(values, 99) * 1000, 1) if values else None,
+            "mean_ms": round(statistics.mean(values) * 1000, 1) if values else None,
+        }
+
+    rss_values = [sample["rss_mb"] for sample in stats.rss_samples]
+    return {
+        "duration_s": round(duration, 2),
+        "users": users,
+        "completed_users": stats.completed_users,
+        "requests": total_requests + total_errors,
+        "throughput_rps": round(total_requests / duration, 2) if duration else None,
+        "error_rate": (
+            round(total_errors / (total_requests + total_errors), 4)
+            if total_requests + total_errors
+            else 0.0
+        ),
+        "phases": phases,
+        "error_samples": stats.error_samples,
+        "rss": {
+            "start_mb": rss_values[0] if rss_values else None,
+            "peak_mb": max(rss_values) if rss_values else None,
+            "end_mb": rss_values[-1] if rss_values else None,
+            "samples": stats.rss_samples,
+        },
+    }
+
+
+async def main(args) -> Dict[str, Any]:
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    server_process = None
+    if args.target:
+        base_url, server_pid = args.target, args.server_pid
+    else:
+        base_url, server_process = await start_server_process(args)
+        server_pid = server_process.pid
+
+    stats = LoadStats()
+    started = time.perf_counter()
+    sampler = (
+        asyncio.create_task(
+            sample_rss(server_pid, stats, args.sample_interval, started)
+        )
+        if server_pid
+        else None
+    )
+
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else {}
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.max_connections),
+    ) as client:
+        users = []
+        for index in range(args.users):
+            users.append(asyncio.create_task(simulate_user(client, args, stats, index)))
+            # Poisson arrivals at the configured rate
+            await asyncio.sleep(random.expovariate(args.rate))
+        await asyncio.gather(*users)
+    duration = time.perf_counter() - started
+
+    if sampler:
+        sampler.cancel()
+    if server_process:
+        await stop_server_process(server_process)
+    return build_report(stats, duration, args.users)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load test the A2A server's /run endpoint."
+    )
+    parser.add_argument(
+        "--users", type=int, default=50, help="Simulated users in total."
+    )
+    parser.add_argument("--rate", type=float, default=5.0, help="New users per second.")
+    parser.add_argument(
+        "--think-time", type=float, default=0.5, help="Mean pause between turns (s)."
+    )
+    parser.add_argument(
+        "--image-ratio",
+        type=float,
+        default=0.5,
+        help="Share of users asking for an image.",
+    )
+    parser.add_argument(
+        "--model-latency", type=float, default=0.2, help="Mean fake model latency (s)."
+    )
+    parser.add_argument(
+        "--image-latency",
+        type=float,
+        default=0.5,
+        help="Fake image generation time (s).",
+    )
+    parser.add_argument(
+        "--target", help="Base URL of a running server to test instead."
+    )
+    parser.add_argument("--server-pid", type=int, help="PID of --target to sample RSS.")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument(
+        "--accept-encoding", default="gzip", help="Accept-Encoding header to send."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for arrivals, topics, think times and fake latencies.",
+    )
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
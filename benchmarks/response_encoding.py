@@ -0,0 +1,195 @@
+"""
+Benchmark for /run response encodings.
+Measures bytes on the wire and serialize time of typical story, post and image turns
+for each serializer (stdlib json, the fast JSON path, MessagePack) with and without
+compression. Encodings whose optional dependency is not installed are skipped.
+
+Usage:
+    python -m benchmarks.response_encoding [--iterations 500]
+"""
+
+import json
+import time
+import uuid
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+from common import encoding
+
+
+STORY = (
+    "Three years ago I pushed my first pull request to an open source project and "
+    "it was rejected within an hour. The maintainer left a long, kind review that "
+    "taught me more about testing than any course I had taken. "
+) * 4
+POST = (
+    STORY
+    + "\n\nWhat was the review that changed how you write code?\n\n"
+    + ("#OpenSource #SoftwareEngineering #Mentorship #CareerGrowth #Python")
+)
+
+
+def _event(author: str, text: str = None, function_call=None, function_response=None):
+    """Builds a dict shaped like an ADK event dumped with model_dump(exclude_none=True)."""
+    parts: List[Dict[str, Any]] = []
+    if text:
+        parts.append({"text": text})
+    if function_call:
+        parts.append({"function_call": {"id": str(uuid.uuid4()), **function_call}})
+    if function_response:
+        parts.append(
+            {"function_response": {"id": str(uuid.uuid4()), **function_response}}
+        )
+    return {
+        "content": {"parts": parts, "role": "model"},
+        "invocation_id": f"e-{uuid.uuid4()}",
+        "author": author,
+        "actions": {
+            "state_delta": {},
+            "artifact_delta": {},
+            "requested_auth_configs": {},
+        },
+        "id": str(uuid.uuid4()),
+        "timestamp": time.time(),
+    }
+
+
+def _transfer(source: str, target: str) -> List[Dict[str, Any]]:
+    return [
+        _event(
+            source,
+            function_call={"name": "transfer_to_agent", "args": {"agent_name": target}},
+        ),
+        _event(
+            source,
+            function_response={
+                "name": "transfer_to_agent",
+                "response": {"result": None},
+            },
+        ),
+    ]
+
+
+def _turn(message: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    tool_calls = []
+    tool_responses = []
+    for event in events:
+        for part in event["content"]["parts"]:
+            if "function_call" in part:
+                call = part["function_call"]
+                tool_calls.append(
+                    {"call_id": call["id"], "name": call["name"], "args": call["args"]}
+                )
+            if "function_response" in part:
+                response = part["function_response"]
+                tool_responses.append(
+                    {
+                        "response_id": response["id"],
+                        "name": response["name"],
+                        "result": response["response"],
+                    }
+                )
+    return {
+        "message": message,
+        "session_id": str(uuid.uuid4()),
+        "status": "success",
+        "data": {
+            "image_artifacts": {},
+            "raw_events": events,
+            "tool_calls": tool_calls,
+            "tool_responses": tool_responses,
+        },
+    }
+
+
+def typical_turns() -> Dict[str, Dict[str, Any]]:
+    """Returns representative /run payloads for the story, post and image phases."""
+    story = _turn(
+        STORY,
+        _transfer("linkedin_post_agent", "story_agent")
+        + [_event("story_agent", STORY)],
+    )
+    post = _turn(
+        POST, _transfer("hashtag_agent", "post_agent") + [_event("post_agent", POST)]
+    )
+
+    image_url = "https://res.cloudinary.com/demo/image/upload/v1718000000/linkedin_post_agent/linkedin_post_image.png"
+    image_result = {
+        "status": "success",
+        "message": "Image generated successfully.",
+        "data": {
+            "artifact_version": 0,
+            "image_url": image_url,
+            "image_public_id": "linkedin_post_agent/linkedin_post_image",
+            "image_format": "png",
+            "image_version": 1718000000,
+        },
+        "prompt_used": "A developer reading a code review at golden hour, cinematic, 4K",
+    }
+    image_events = _transfer("linkedin_post_agent", "image_agent") + [
+        _event(
+            "image_agent",
+            function_call={
+                "name": "create_image",
+                "args": {"prompt": image_result["prompt_used"]},
+            },
+        ),
+        _event(
+            "image_agent",
+            function_response={"name": "create_image", "response": image_result},
+        ),
+        _event("image_agent", f"Here is your image: <{image_url}>"),
+    ]
+    image_events[-2]["actions"]["artifact_delta"] = {"linkedin_post_image.png": 0}
+    image = _turn(f"Here is your image: <{image_url}>", image_events)
+    image["data"]["image_artifacts"] = {"linkedin_post_image.png": 0}
+    return {"story": story, "post": post, "image": image}
+
+
+def _serializers() -> Dict[str, Callable[[Any], bytes]]:
+    serializers = {
+        "json (stdlib)": lambda payload: json.dumps(payload).encode("utf-8"),
+        "json (fast path)": encoding.dumps_json,
+    }
+    if encoding.msgpack is not None:
+        serializers["msgpack"] = encoding.dumps_msgpack
+    return serializers
+
+
+def _time_us(func: Callable[[], Any], iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return round(statistics.median(samples), 1)
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for phase, payload in typical_turns().items():
+        rows = {}
+        for name, serialize in _serializers().items():
+            body = serialize(payload)
+            rows[name] = {
+                "bytes": len(body),
+                "serialize_us": _time_us(lambda: serialize(payload), iterations),
+            }
+            for content_encoding in encoding.available_encodings():
+                rows[f"{name} + {content_encoding}"] = {
+                    "bytes": len(encoding.compress(body, content_encoding)),
+                    "serialize_us": _time_us(
+                        lambda: encoding.compress(serialize(payload), content_encoding),
+                        iterations,
+                    ),
+                }
+        results[phase] = rows
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /run response encodings.")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
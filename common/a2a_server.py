@@ -6,12 +6,17 @@ This module provides a FastAPI server implementation for handling A2A communicat
 import os
 import json
 import inspect
+from contextlib import asynccontextmanager, nullcontext
 from typing import Dict, Any, Optional
 
-from fastapi import FastAPI, Body
+from fastapi import FastAPI, Body, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
+from .encoding import DEFAULT_COMPRESSION_MIN_SIZE, encode_response
+from .diagnostics import Diagnostics, create_debug_router, token_matches
+from .jobs import Job, JobManager
+
 
 class AgentRequest(BaseModel):
     """
@@ -43,36 +48,148 @@ class AgentResponse(BaseModel):
     )
 
 
+class JobSubmission(BaseModel):
+    """
+    Model for the response body of a job submission.
+    """
+
+    job_id: str = Field(..., description="Identifier to poll the job with.")
+    status: str = Field(..., description="Current state of the job.")
+    session_id: str = Field(..., description="Session the turn runs in.")
+    status_url: str = Field(..., description="URL to poll for the job's status.")
+
+
 # Helper function to create server
 def create_agent_server(name: str, description: str, task_manager: Any) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """
+        Starts the background work set up below when the server starts, and stops it in
+        reverse order on shutdown. The task manager restores its state (e.g. session
+        snapshots) before jobs resume, and takes its final snapshot after they stop.
+        """
+        if diagnostics:
+            diagnostics.loop_monitor.start()
+        if hasattr(task_manager, "start"):
+            await task_manager.start()
+        await job_manager.start()
+        try:
+            yield
+        finally:
+            await job_manager.stop()
+            if hasattr(task_manager, "stop"):
+                await task_manager.stop()
+            if diagnostics:
+                diagnostics.loop_monitor.stop()
+
     # Create a FastAPI application instance
-    app = FastAPI(title=f"{name} Agent", description=description)
+    app = FastAPI(title=f"{name} Agent", description=description, lifespan=lifespan)
 
     # Define the path to the agent's card information
     module_path = inspect.getmodule(inspect.stack()[1][0]).__file__
     well_known_path = os.path.join(os.path.dirname(module_path), ".well-known")
     agent_json_path = os.path.join(well_known_path, "agent.json")
 
-    # run endpoint to process tasks
-    @app.post("/run", response_model=AgentResponse)
-    async def run(request: AgentRequest = Body(...)) -> AgentResponse:
+    # Responses at least this large are compressed when the client accepts it
+    compression_min_size = int(
+        os.getenv("A2A_COMPRESSION_MIN_SIZE", DEFAULT_COMPRESSION_MIN_SIZE)
+    )
+
+    # Debug endpoints are only mounted when an admin token is configured
+    admin_token = os.getenv("A2A_ADMIN_TOKEN")
+    diagnostics: Optional[Diagnostics] = None
+    if admin_token:
+        diagnostics = Diagnostics(
+            task_manager,
+            loop_block_threshold=float(os.getenv("A2A_LOOP_BLOCK_THRESHOLD_MS", 100))
+            / 1000,
+        )
+        app.include_router(create_debug_router(diagnostics, admin_token))
+
+    def profile_tag(http_request: Request) -> Optional[str]:
+        """
+        Returns the X-Profile-Tag of an admin request, which asks for it to be profiled.
+        """
+        tag = http_request.headers.get("x-profile-tag")
+        token = http_request.headers.get("x-admin-token")
+        if diagnostics and tag and token_matches(token, admin_token):
+            return tag
+        return None
+
+    async def run_task(
+        message: str, context: Dict[str, Any], session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Runs one turn through the task manager and shapes the result as an AgentResponse.
+        """
         try:
-            result = await task_manager.process_task(
-                request.message, request.context, request.session_id
-            )
-            return AgentResponse(
+            result = await task_manager.process_task(message, context, session_id)
+            response = AgentResponse(
                 message=result.get("message", "Task completed successfully."),
-                session_id=result.get("session_id", None),
+                session_id=result.get("session_id", session_id),
                 status=result.get("status", "success"),
                 data=result.get("data", {}),
             )
         except Exception as e:
-            return AgentResponse(
+            response = AgentResponse(
                 message=f"Error processing task: {str(e)}",
-                session_id=request.session_id,
+                session_id=session_id,
                 status="error",
                 data={"error_type": type(e).__name__, "error_message": str(e)},
             )
+        return response.model_dump()
+
+    def encode(http_request: Request, payload: Dict[str, Any], status_code: int = 200):
+        """
+        Serializes according to the client's Accept and Accept-Encoding headers.
+        """
+        return encode_response(
+            payload,
+            accept=http_request.headers.get("accept"),
+            accept_encoding=http_request.headers.get("accept-encoding"),
+            min_size=compression_min_size,
+            status_code=status_code,
+        )
+
+    # Job manager for turns submitted asynchronously, with workers tied to the app lifespan
+    job_manager = JobManager.from_env(run_task)
+
+    # run endpoint to process tasks
+    @app.post("/run", response_model=AgentResponse)
+    async def run(http_request: Request, request: AgentRequest = Body(...)):
+        tag = profile_tag(http_request)
+        with diagnostics.profile_request(tag) if tag else nullcontext():
+            payload = await run_task(
+                request.message, request.context, request.session_id
+            )
+        return encode(http_request, payload)
+
+    # jobs endpoint to submit a task without waiting for it
+    @app.post("/jobs", response_model=JobSubmission, status_code=202)
+    async def submit_job(http_request: Request, request: AgentRequest = Body(...)):
+        """
+        Queues a turn and returns immediately. Poll the status_url or wait for the
+        webhook configured with A2A_JOB_WEBHOOK_URL.
+        """
+        job = await job_manager.submit(
+            request.message, request.context, request.session_id
+        )
+        return JobSubmission(
+            job_id=job.job_id,
+            status=job.status,
+            session_id=job.session_id,
+            status_url=str(http_request.url_for("get_job", job_id=job.job_id)),
+        )
+
+    @app.get("/jobs/{job_id}", response_model=Job)
+    async def get_job(http_request: Request, job_id: str):
+        """
+        Returns the state of a job, including the agent response once it has finished.
+        """
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+        return encode(http_request, job.model_dump())
 
     # agent_card endpoint to retrieve agent information
     @app.get("/.well-known/agent.json", response_model=Dict[str, Any])
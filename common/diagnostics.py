@@ -0,0 +1,570 @@
+"""
+On-demand diagnostics for the A2A server.
+This module provides admin-gated debug endpoints to profile the server (cProfile or
+sampling, for a time window or a single tagged request), take tracemalloc snapshots,
+estimate per-session memory and report event-loop blocking incidents.
+"""
+
+import io
+import sys
+import json
+import time
+import pstats
+import asyncio
+import cProfile
+import secrets
+import marshal
+import logging
+import threading
+import traceback
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+logger = logging.getLogger(__name__)
+
+
+# Keep only the most recent tagged request profiles and loop blocking incidents
+MAX_REQUEST_PROFILES = 20
+MAX_BLOCKING_INCIDENTS = 100
+
+
+def token_matches(token: Optional[str], admin_token: str) -> bool:
+    """
+    Checks a header token against the admin token in constant time. Compares bytes,
+    because compare_digest rejects non-ASCII strings.
+    """
+    if not token:
+        return False
+    return secrets.compare_digest(token.encode("utf-8"), admin_token.encode("utf-8"))
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _download(content: Any, filename: str, media_type: str = "text/plain") -> Response:
+    """Wraps a report in a response the browser saves as a file."""
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _pstats_text(profile: cProfile.Profile, limit: int = 80) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def _pstats_binary(profile: cProfile.Profile) -> bytes:
+    """Serializes a profile in the .prof format read by pstats, snakeviz and friends."""
+    profile.create_stats()
+    return marshal.dumps(profile.stats)
+
+
+def _deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximates the memory held by an object graph, counting shared objects once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    # Containers are copied before walking them, since this can run in a worker thread
+    # while the event loop keeps mutating sessions
+    if isinstance(obj, dict):
+        size += sum(
+            _deep_size(key, seen) + _deep_size(value, seen)
+            for key, value in list(obj.items())
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_size(item, seen) for item in list(obj))
+    elif isinstance(obj, BaseModel):
+        size += _deep_size(obj.__dict__, seen)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+
+def _artifact_owner(path: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    Splits an InMemoryArtifactService path into (app_name, user_id, session_id).
+
+    Paths look like "app/user/session/filename", or "app/user/user/filename" for
+    user-namespaced files (named "user:..."), which belong to no session and get a
+    session_id of None. Returns None for paths in neither form.
+    """
+    parts = path.split("/", 3)
+    if len(parts) != 4:
+        return None
+    app_name, user_id, session_id, filename = parts
+    if session_id == "user" and filename.startswith("user:"):
+        return app_name, user_id, None
+    return app_name, user_id, session_id
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the event loop thread's stack from a background
+    thread. Output is in the folded-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def report(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+class LoopBlockMonitor:
+    """
+    Detects event-loop blocking. A coroutine on the loop records a heartbeat; a
+    watchdog thread captures the loop thread's stack when the heartbeat goes stale.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.02):
+        self.threshold = threshold
+        self.interval = interval
+        self.incidents: deque = deque(maxlen=MAX_BLOCKING_INCIDENTS)
+        self._last_beat = time.monotonic()
+        self._open_incident: Optional[Dict[str, Any]] = None
+        self._thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts monitoring. Must be called from the event loop thread."""
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-block-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            now = time.monotonic()
+            incident = self._open_incident
+            if incident is not None:
+                # The loop is running again, so the incident is over
+                incident["blocked_ms"] = round((now - self._last_beat) * 1000, 1)
+                self._open_incident = None
+            self._last_beat = now
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat
+            if stalled < self.threshold or self._open_incident is not None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            incident = {
+                "detected_at": datetime.now(timezone.utc).isoformat(),
+                "blocked_ms": None,
+                "stack": traceback.format_stack(frame) if frame else [],
+            }
+            self._open_incident = incident
+            self.incidents.append(incident)
+            logger.warning(
+                f"Event loop blocked for more than {self.threshold * 1000:.0f} ms"
+            )
+
+
+class Diagnostics:
+    """
+    Holds the profiling, memory and loop monitoring state behind the debug endpoints.
+    """
+
+    def __init__(self, task_manager: Any, loop_block_threshold: float = 0.1):
+        self.task_manager = task_manager
+        self.loop_monitor = LoopBlockMonitor(threshold=loop_block_threshold)
+        self._window_profiler: Any = None
+        self._window_mode: Optional[str] = None
+        self._window_started: Optional[str] = None
+        self._window_timer: Optional[asyncio.Task] = None
+        self._last_window_report: Optional[Dict[str, Any]] = None
+        self._request_profiles: "OrderedDict[str, cProfile.Profile]" = OrderedDict()
+        self._request_profiling = False
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def profiling(self) -> bool:
+        return self._window_profiler is not None
+
+    def start_profile(self, mode: str, duration: Optional[float] = None) -> None:
+        """
+        Starts a window profile of the whole server.
+
+        Args:
+            mode (str): "cprofile" for deterministic profiling or "sampling" for a
+            low-overhead stack sampler.
+            duration (Optional[float]): Stop automatically after this many seconds.
+        """
+        if self._request_profiling:
+            raise RuntimeError("A tagged request is being profiled.")
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif mode == "sampling":
+            profiler = SamplingProfiler(thread_id=threading.get_ident())
+            profiler.start()
+        else:
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        self._window_profiler = profiler
+        self._window_mode = mode
+        self._window_started = _timestamp()
+        if duration:
+            self._window_timer = asyncio.get_running_loop().create_task(
+                self._stop_after(duration)
+            )
+
+    async def _stop_after(self, duration: float) -> None:
+        await asyncio.sleep(duration)
+        self._window_timer = None
+        self.stop_profile()
+
+    def stop_profile(self) -> Dict[str, Any]:
+        """Stops the window profile and keeps its report for download."""
+        profiler = self._window_profiler
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        else:
+            profiler.stop()
+        if self._window_timer and self._window_timer is not asyncio.current_task():
+            self._window_timer.cancel()
+            self._window_timer = None
+
+        self._last_window_report = {
+            "mode": self._window_mode,
+            "started": self._window_started,
+            "profiler": profiler,
+        }
+        self._window_profiler = None
+        return self._last_window_report
+
+    @property
+    def last_window_report(self) -> Optional[Dict[str, Any]]:
+        return self._last_window_report
+
+    @contextmanager
+    def profile_request(self, tag: Optional[str]):
+        """
+        Profiles the body of the `with` block with cProfile and stores it under `tag`.
+
+        Other requests interleaved on the event loop during the awaited work are
+        captured too, so the report is exact only when the server is otherwise idle.
+        """
+        if not tag:
+            yield
+            return
+        if self.profiling or self._request_profiling:
+            # Only one profiler can be attached to the interpreter at a time
+            logger.warning(f"Skipping profile for '{tag}', another profile is running")
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        self._request_profiling = True
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._request_profiling = False
+            self._request_profiles[tag] = profiler
+            while len(self._request_profiles) > MAX_REQUEST_PROFILES:
+                self._request_profiles.popitem(last=False)
+
+    def request_profile(self, tag: str) -> Optional[cProfile.Profile]:
+        return self._request_profiles.get(tag)
+
+    def stop_tracemalloc(self) -> None:
+        tracemalloc.stop()
+        self._previous_snapshot = None
+
+    def tracemalloc_report(self, limit: int = 25) -> str:
+        """Lists the top allocators, and the biggest growth since the previous snapshot."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Traced memory: current={current / 1024 / 1024:.1f} MiB "
+            f"peak={peak / 1024 / 1024:.1f} MiB",
+            "",
+            f"Top {limit} allocators by line:",
+        ]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:limit])
+
+        if self._previous_snapshot is not None:
+            lines.extend(["", f"Top {limit} changes since previous snapshot:"])
+            lines.extend(
+                str(stat)
+                for stat in snapshot.compare_to(self._previous_snapshot, "lineno")[
+                    :limit
+                ]
+            )
+        self._previous_snapshot = snapshot
+        return "\n".join(lines) + "\n"
+
+    def session_memory(self) -> Dict[str, Any]:
+        """
+        Estimates the memory held by each session and its artifacts.
+
+        Walking the object graphs is slow, so call this from a worker thread rather
+        than the event loop.
+        """
+        session_service = getattr(self.task_manager, "session_service", None)
+        artifact_service = getattr(self.task_manager, "artifact_service", None)
+        sessions_by_app = getattr(session_service, "sessions", None) or {}
+        artifacts = getattr(artifact_service, "artifacts", None) or {}
+
+        # Session-scoped usage is keyed by (app, user, session), user-namespaced
+        # files by (app, user, None)
+        artifact_usage: Dict[tuple, Dict[str, int]] = {}
+        for path, versions in list(artifacts.items()):
+            owner = _artifact_owner(path)
+            if owner is None:
+                logger.warning(f"Skipping artifact with unexpected path '{path}'")
+                continue
+            usage = artifact_usage.setdefault(owner, {"artifacts": 0, "bytes": 0})
+            usage["artifacts"] += len(versions)
+            usage["bytes"] += _deep_size(versions)
+
+        sessions: List[Dict[str, Any]] = []
+        for app_name, users in list(sessions_by_app.items()):
+            for user_id, user_sessions in list(users.items()):
+                for session_id, session in list(user_sessions.items()):
+                    usage = artifact_usage.get(
+                        (app_name, user_id, session_id), {"artifacts": 0, "bytes": 0}
+                    )
+                    sessions.append(
+                        {
+                            "app_name": app_name,
+                            "user_id": user_id,
+                            "session_id": session_id,
+                            "events": len(getattr(session, "events", [])),
+                            "session_bytes": _deep_size(session),
+                            "artifact_versions": usage["artifacts"],
+                            "artifact_bytes": usage["bytes"],
+                        }
+                    )
+        sessions.sort(
+            key=lambda item: item["session_bytes"] + item["artifact_bytes"],
+            reverse=True,
+        )
+
+        return {
+            "session_service": type(session_service).__name__,
+            "artifact_service": type(artifact_service).__name__,
+            "sessions": len(sessions),
+            "total_session_bytes": sum(item["session_bytes"] for item in sessions),
+            "total_artifact_bytes": sum(
+                usage["bytes"] for usage in artifact_usage.values()
+            ),
+            "by_session": sessions,
+            "user_artifacts": [
+                {
+                    "app_name": app_name,
+                    "user_id": user_id,
+                    "artifact_versions": usage["artifacts"],
+                    "artifact_bytes": usage["bytes"],
+                }
+                for (app_name, user_id, session_id), usage in artifact_usage.items()
+                if session_id is None
+            ],
+        }
+
+
+def create_debug_router(diagnostics: Diagnostics, admin_token: str) -> APIRouter:
+    """
+    Creates the /debug endpoints. Every endpoint requires the X-Admin-Token header.
+    """
+
+    def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+        if not token_matches(x_admin_token, admin_token):
+            raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+    router = APIRouter(prefix="/debug", dependencies=[Depends(require_admin)])
+
+    def _profile_download(profiler: Any, name: str, fmt: str) -> Response:
+        if isinstance(profiler, SamplingProfiler):
+            return _download(profiler.report(), f"{name}.folded")
+        if fmt == "pstats":
+            return _download(
+                _pstats_binary(profiler), f"{name}.prof", "application/octet-stream"
+            )
+        return _download(_pstats_text(profiler), f"{name}.txt")
+
+    @router.post("/profile/start")
+    async def start_profile(
+        mode: str = Query("cprofile", pattern="^(cprofile|sampling)$"),
+        duration: Optional[float] = Query(None, gt=0, le=3600),
+    ):
+        """
+        Starts a window profile, optionally stopping after `duration` seconds.
+        """
+        if diagnostics.profiling:
+            raise HTTPException(status_code=409, detail="A profile is already running.")
+        try:
+            diagnostics.start_profile(mode, duration)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return {"status": "started", "mode": mode, "duration": duration}
+
+    @router.post("/profile/stop")
+    async def stop_profile(fmt: str = Query("text", pattern="^(text|pstats)$")):
+        """
+        Stops the window profile and downloads its report.
+        """
+        if not diagnostics.profiling:
+            raise HTTPException(status_code=409, detail="No profile is running.")
+        report = diagnostics.stop_profile()
+        return _profile_download(
+            report["profiler"], f"profile-{report['started']}", fmt
+        )
+
+    @router.get("/profile/report")
+    async def get_profile_report(fmt: str = Query("text", pattern="^(text|pstats)$")):
+        """
+        Downloads the report of the last finished window profile.
+        """
+        report = diagnostics.last_window_report
+        if report is None:
+            raise HTTPException(status_code=404, detail="No finished profile.")
+        return _profile_download(
+            report["profiler"], f"profile-{report['started']}", fmt
+        )
+
+    @router.get("/profile/requests/{tag}")
+    async def get_request_profile(
+        tag: str, fmt: str = Query("text", pattern="^(text|pstats)$")
+    ):
+        """
+        Downloads the profile of a /run request sent with the X-Profile-Tag header.
+        """
+        profiler = diagnostics.request_profile(tag)
+        if profiler is None:
+            raise HTTPException(status_code=404, detail=f"No profile for tag '{tag}'.")
+        return _profile_download(profiler, f"request-{tag}", fmt)
+
+    @router.post("/tracemalloc/start")
+    async def start_tracemalloc(frames: int = Query(10, ge=1, le=100)):
+        """
+        Starts tracing allocations, keeping `frames` frames per traceback.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return {"status": "tracing", "frames": tracemalloc.get_traceback_limit()}
+
+    @router.get("/tracemalloc/snapshot")
+    async def tracemalloc_snapshot(limit: int = Query(25, ge=1, le=500)):
+        """
+        Takes a snapshot and downloads the top allocators.
+        """
+        if not tracemalloc.is_tracing():
+            raise HTTPException(status_code=409, detail="tracemalloc is not running.")
+        report = await asyncio.to_thread(diagnostics.tracemalloc_report, limit)
+        return _download(report, f"tracemalloc-{_timestamp()}.txt")
+
+    @router.post("/tracemalloc/stop")
+    async def stop_tracemalloc():
+        """
+        Stops tracing allocations and frees the traces.
+        """
+        diagnostics.stop_tracemalloc()
+        return {"status": "stopped"}
+
+    @router.get("/memory/sessions")
+    async def session_memory():
+        """
+        Downloads the approximate memory held by each session and its artifacts.
+        """
+        report = await asyncio.to_thread(diagnostics.session_memory)
+        return _download(
+            json.dumps(report, indent=2),
+            f"sessions-{_timestamp()}.json",
+            "application/json",
+        )
+
+    @router.get("/snapshots")
+    async def snapshot_stats():
+        """
+        Returns how long session snapshots and restores take, if snapshots are enabled.
+        """
+        snapshotter = getattr(diagnostics.task_manager, "snapshotter", None)
+        if snapshotter is None:
+            raise HTTPException(
+                status_code=404, detail="Session snapshots are disabled."
+            )
+        return snapshotter.stats
+
+    @router.get("/loop/blocking")
+    async def loop_blocking():
+        """
+        Downloads the recent event-loop blocking incidents with their stack traces.
+        """
+        monitor = diagnostics.loop_monitor
+        return _download(
+            json.dumps(
+                {
+                    "threshold_ms": monitor.threshold * 1000,
+                    "incidents": list(monitor.incidents),
+                },
+                indent=2,
+            ),
+            f"loop-blocking-{_timestamp()}.json",
+            "application/json",
+        )
+
+    return router
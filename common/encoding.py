@@ -0,0 +1,196 @@
+"""
+Response encoding helpers for the A2A server.
+This module negotiates the serialization format (JSON or MessagePack) and the
+content encoding (zstd or gzip) of agent responses based on the request headers.
+"""
+
+import gzip
+import json
+import base64
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Optional dependencies, each one only enables a faster or smaller encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Bodies smaller than this are sent uncompressed, compression doesn't pay off for them
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+def _default(value: Any) -> Any:
+    """Converts values the serializers don't handle natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, Enum):
+        return value.value
+    # ISO 8601 like orjson, so the output doesn't depend on which serializer is used
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Serializes a payload to compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                payload, default=_default, option=orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder handles
+            pass
+    return json.dumps(
+        payload, default=_default, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def dumps_msgpack(payload: Any) -> bytes:
+    """Serializes a payload to MessagePack, keeping bytes as native binary values."""
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def loads(body: bytes, media_type: str = JSON_MEDIA_TYPE) -> Any:
+    """Deserializes a body produced by `dumps_json` or `dumps_msgpack`."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.unpackb(body, raw=False)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def available_encodings() -> List[str]:
+    """Lists the content encodings this process can produce, best first."""
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compresses a body with the given content encoding ('zstd' or 'gzip')."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Reverses `compress`. A missing or 'identity' encoding returns the body as is."""
+    if not encoding or encoding == "identity":
+        return body
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(body)
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _parse_header(header: Optional[str]) -> List[Tuple[str, float]]:
+    """Parses an Accept-style header into (value, quality) pairs."""
+    items = []
+    for item in (header or "").split(","):
+        value, _, params = item.strip().partition(";")
+        if not value:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        items.append((value.strip().lower(), quality))
+    return items
+
+
+def select_media_type(accept: Optional[str]) -> str:
+    """Picks MessagePack when the client prefers it and it is installed, else JSON."""
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    preferences = dict(_parse_header(accept))
+    msgpack_quality = max(
+        preferences.get(MSGPACK_MEDIA_TYPE, 0.0),
+        preferences.get("application/x-msgpack", 0.0),
+    )
+    json_quality = max(
+        preferences.get(JSON_MEDIA_TYPE, 0.0),
+        preferences.get("application/*", 0.0),
+        preferences.get("*/*", 0.0),
+    )
+    return MSGPACK_MEDIA_TYPE if msgpack_quality > json_quality else JSON_MEDIA_TYPE
+
+
+def select_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Picks the best content encoding the client accepts, or None for identity."""
+    preferences = dict(_parse_header(accept_encoding))
+    wildcard = preferences.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = preferences.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encode_response(
+    payload: Dict[str, Any],
+    accept: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+    min_size: int = DEFAULT_COMPRESSION_MIN_SIZE,
+    status_code: int = 200,
+) -> Response:
+    """
+    Builds a response for the payload in the format and encoding the client asked for.
+
+    Args:
+        payload (Dict[str, Any]): The response body before serialization.
+        accept (Optional[str]): The request's Accept header.
+        accept_encoding (Optional[str]): The request's Accept-Encoding header.
+        min_size (int): Bodies smaller than this many bytes are not compressed.
+        status_code (int): HTTP status code of the response.
+
+    Returns:
+        Response: The serialized, possibly compressed, response.
+    """
+    media_type = select_media_type(accept)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        body = dumps_msgpack(payload)
+    else:
+        body = dumps_json(payload)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = select_encoding(accept_encoding) if len(body) >= min_size else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=body, status_code=status_code, media_type=media_type, headers=headers
+    )
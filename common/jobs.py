@@ -0,0 +1,295 @@
+"""
+Asynchronous job execution for the A2A server.
+This module lets clients submit a turn as a job, which is processed by a pool of
+workers over the task manager while the client polls for its status or waits for a
+webhook callback. Jobs are persisted with bounded retention so unfinished ones are
+resumed after a restart.
+"""
+
+import os
+import hmac
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .encoding import dumps_json, loads
+
+
+logger = logging.getLogger(__name__)
+
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+WEBHOOK_ATTEMPTS = 3
+
+
+class Job(BaseModel):
+    """
+    Model for an asynchronous agent turn and its outcome.
+    """
+
+    job_id: str = Field(..., description="Unique identifier of the job.")
+    status: str = Field(default=JOB_QUEUED, description="Current state of the job.")
+    message: str = Field(..., description="The message sent to the agent.")
+    context: Dict[str, Any] = Field(
+        default_factory=dict, description="Contextual information for the agent."
+    )
+    session_id: str = Field(..., description="Session the turn runs in.")
+    result: Optional[Dict[str, Any]] = Field(
+        None, description="The agent response once the job has finished."
+    )
+    attempts: int = Field(default=0, description="How many times the job was started.")
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+
+class JobStore:
+    """
+    Keeps jobs in memory and, when a directory is configured, on disk as one file per job.
+
+    Finished jobs are dropped once they are older than `ttl_s` or when more than
+    `max_jobs` jobs are stored; queued and running jobs are never dropped.
+    """
+
+    def __init__(self, directory: Optional[str], max_jobs: int, ttl_s: float):
+        self.directory = directory
+        self.max_jobs = max_jobs
+        self.ttl_s = ttl_s
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _write(self, job: Job) -> None:
+        path = self._path(job.job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dumps_json(job.model_dump()))
+        os.replace(tmp_path, path)
+
+    def _remove(self, job_id: str) -> None:
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> list:
+        """Reads persisted jobs from disk and returns the unfinished ones."""
+        if not self.directory:
+            return []
+        jobs = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "rb") as f:
+                    jobs.append(Job.model_validate(loads(f.read())))
+            except Exception as e:
+                logger.error(f"Skipping unreadable job file {filename}: {e}")
+        for job in sorted(jobs, key=lambda job: job.created_at):
+            self._jobs[job.job_id] = job
+        return [job for job in self._jobs.values() if job.status not in FINISHED_STATES]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def save(self, job: Job) -> None:
+        """Stores a job, persisting it off the event loop, and applies retention."""
+        job.updated_at = time.time()
+        self._jobs[job.job_id] = job
+        if self.directory:
+            await asyncio.to_thread(self._write, job)
+        await self.prune()
+
+    async def prune(self) -> None:
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        excess = len(self._jobs) - self.max_jobs
+        expired = []
+        for job in finished:
+            if now - job.updated_at > self.ttl_s or excess > 0:
+                expired.append(job.job_id)
+                excess -= 1
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self.directory and expired:
+            await asyncio.to_thread(
+                lambda: [self._remove(job_id) for job_id in expired]
+            )
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a pool of worker tasks.
+
+    Jobs of the same session run one at a time and in submission order, so a client
+    can queue several turns of one conversation safely. Only the next job of each
+    session is on the worker queue; the rest wait in a per-session backlog, so one
+    busy session can't occupy every worker.
+    """
+
+    def __init__(
+        self,
+        run_task: Callable[[str, Dict[str, Any], str], Awaitable[Dict[str, Any]]],
+        store: JobStore,
+        workers: int = 4,
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None,
+    ):
+        self.run_task = run_task
+        self.store = store
+        self.workers = workers
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        # Sessions with a job queued or running, mapped to their jobs waiting behind it
+        self._session_backlogs: Dict[str, Deque[str]] = {}
+        self._tasks: list = []
+        self._notifications: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(
+        cls, run_task: Callable[..., Awaitable[Dict[str, Any]]]
+    ) -> "JobManager":
+        return cls(
+            run_task=run_task,
+            store=JobStore(
+                directory=os.getenv("A2A_JOB_STORE_DIR") or None,
+                max_jobs=int(os.getenv("A2A_JOB_MAX", 1000)),
+                ttl_s=float(os.getenv("A2A_JOB_TTL_S", 3600)),
+            ),
+            workers=int(os.getenv("A2A_JOB_WORKERS", 4)),
+            webhook_url=os.getenv("A2A_JOB_WEBHOOK_URL") or None,
+            webhook_secret=os.getenv("A2A_JOB_WEBHOOK_SECRET") or None,
+        )
+
+    async def start(self) -> None:
+        """Resumes persisted unfinished jobs and starts the workers."""
+        resumed = self.store.load()
+        for job in resumed:
+            job.status = JOB_QUEUED
+            await self.store.save(job)
+            self._enqueue(job)
+        if resumed:
+            logger.info(f"Resumed {len(resumed)} unfinished jobs")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Stops the workers and pending webhook deliveries. Jobs still running are resumed
+        on the next start.
+        """
+        tasks = self._tasks + list(self._notifications)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._notifications.clear()
+
+    async def submit(
+        self, message: str, context: Dict[str, Any], session_id: Optional[str] = None
+    ) -> Job:
+        """Queues a turn and returns its job right away."""
+        job = Job(
+            job_id=str(uuid.uuid4()),
+            message=message,
+            context=context,
+            session_id=session_id or str(uuid.uuid4()),
+        )
+        await self.store.save(job)
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def _enqueue(self, job: Job) -> None:
+        """Queues a job for the workers, or behind the job its session already has queued."""
+        backlog = self._session_backlogs.get(job.session_id)
+        if backlog is None:
+            self._session_backlogs[job.session_id] = deque()
+            self._queue.put_nowait(job.job_id)
+        else:
+            backlog.append(job.job_id)
+
+    def _release(self, session_id: str) -> None:
+        """Queues the next job of a session once its previous job has finished."""
+        backlog = self._session_backlogs.get(session_id)
+        if backlog:
+            self._queue.put_nowait(backlog.popleft())
+        else:
+            self._session_backlogs.pop(session_id, None)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self.store.get(job_id)
+            try:
+                if job is not None and job.status == JOB_QUEUED:
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed on job {job_id}: {e}")
+            finally:
+                if job is not None:
+                    self._release(job.session_id)
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        await self.store.save(job)
+
+        result = await self.run_task(job.message, job.context, job.session_id)
+        job.result = result
+        job.status = JOB_SUCCEEDED if result.get("status") == "success" else JOB_FAILED
+        await self.store.save(job)
+
+        if self.webhook_url:
+            # Delivered in the background, so retries don't hold up a worker
+            task = asyncio.create_task(self._notify(job))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    async def _notify(self, job: Job) -> None:
+        """Posts the finished job to the webhook, signing it when a secret is set."""
+        body = dumps_json(job.model_dump())
+        headers = {"Content-Type": "application/json"}
+        if self.webhook_secret:
+            signature = hmac.new(
+                self.webhook_secret.encode("utf-8"), body, hashlib.sha256
+            ).hexdigest()
+            headers["X-Signature-SHA256"] = signature
+
+        async with httpx.AsyncClient(timeout=10) as client:
+            for attempt in range(1, WEBHOOK_ATTEMPTS + 1):
+                try:
+                    response = await client.post(
+                        self.webhook_url, content=body, headers=headers
+                    )
+                    if response.status_code < 400:
+                        return
+                    logger.warning(
+                        f"Webhook for job {job.job_id} returned {response.status_code}"
+                    )
+                except httpx.HTTPError as e:
+                    logger.warning(f"Webhook for job {job.job_id} failed: {e}")
+                if attempt < WEBHOOK_ATTEMPTS:
+                    await asyncio.sleep(2**attempt)
+        logger.error(f"Giving up on webhook for job {job.job_id}")
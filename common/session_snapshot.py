@@ -0,0 +1,552 @@
+"""
+Session snapshots for warm restarts of the A2A server.
+This module periodically writes incremental snapshots of in-memory sessions and their
+artifacts to disk in a compact binary format, and restores individual sessions lazily
+on first access after a restart. Artifacts are read and written through the artifact
+service API, so the snapshot doesn't depend on how the service stores them.
+"""
+
+import os
+import json
+import time
+import base64
+import shutil
+import struct
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from google.adk.artifacts import BaseArtifactService
+from google.adk.sessions import InMemorySessionService, Session
+from google.genai import types
+
+from .encoding import available_encodings, compress, decompress
+
+
+logger = logging.getLogger(__name__)
+
+
+# Session file layout: MAGIC, one byte for the format version, one byte for the
+# compression codec, then the compressed payload. The payload is a sequence of
+# length-prefixed frames: the session JSON and the JSON list of the session's artifact
+# filenames.
+#
+# Artifact versions never change once saved, so each one is written once, to its own
+# file next to the session snapshot: <session>.artifacts/<filename>/<version>.part, or
+# @user.artifacts/<filename>/<version>.part for user-namespaced artifacts ("user:...").
+# A version file is ARTIFACT_MAGIC, the format version, then uncompressed frames: the
+# Part JSON without its inline data and, for inline data, the blob metadata JSON and
+# the raw bytes.
+MAGIC = b"LPSS"
+ARTIFACT_MAGIC = b"LPSA"
+FORMAT_VERSION = 2
+CODECS = {"gzip": b"g", "zstd": b"z"}
+CODEC_NAMES = {value: key for key, value in CODECS.items()}
+STATE_FILENAME = "_state.json"
+USER_ARTIFACTS_DIRNAME = "@user.artifacts"
+
+
+def _encode_name(name: str) -> str:
+    """Turns an id into a filesystem-safe, reversible path component."""
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_name(encoded: str) -> str:
+    padding = "=" * (-len(encoded) % 4)
+    return base64.urlsafe_b64decode(encoded + padding).decode("utf-8")
+
+
+def _frame(data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + data
+
+
+def _read_frames(payload: bytes) -> List[bytes]:
+    frames, offset = [], 0
+    while offset < len(payload):
+        (length,) = struct.unpack_from(">I", payload, offset)
+        offset += 4
+        frames.append(payload[offset : offset + length])
+        offset += length
+    return frames
+
+
+def encode_snapshot(session_json: bytes, filenames: List[str]) -> bytes:
+    """Packs a serialized session and the names of its artifacts into a snapshot."""
+    frames = _frame(session_json) + _frame(json.dumps(filenames).encode("utf-8"))
+    codec = available_encodings()[0]
+    return MAGIC + bytes([FORMAT_VERSION]) + CODECS[codec] + compress(frames, codec)
+
+
+def decode_snapshot(data: bytes) -> Tuple[Session, List[str]]:
+    """Unpacks a snapshot written by `encode_snapshot`."""
+    if data[:4] != MAGIC or data[4] != FORMAT_VERSION:
+        raise ValueError("Not a session snapshot or unsupported format version.")
+    frames = _read_frames(decompress(data[6:], CODEC_NAMES[data[5:6]]))
+    return Session.model_validate_json(frames[0]), json.loads(frames[1])
+
+
+def encode_artifact(part: types.Part) -> bytes:
+    """Packs one artifact version, keeping inline data as raw bytes."""
+    blob = part.inline_data
+    if blob is None or blob.data is None:
+        frames = [part.model_dump_json(exclude_none=True).encode("utf-8")]
+    else:
+        frames = [
+            part.model_dump_json(exclude={"inline_data"}, exclude_none=True).encode(
+                "utf-8"
+            ),
+            blob.model_dump_json(exclude={"data"}, exclude_none=True).encode("utf-8"),
+            blob.data,
+        ]
+    return (
+        ARTIFACT_MAGIC
+        + bytes([FORMAT_VERSION])
+        + b"".join(_frame(frame) for frame in frames)
+    )
+
+
+def decode_artifact(data: bytes) -> types.Part:
+    """Unpacks an artifact version written by `encode_artifact`."""
+    if data[:4] != ARTIFACT_MAGIC or data[4] != FORMAT_VERSION:
+        raise ValueError("Not an artifact snapshot or unsupported format version.")
+    frames = _read_frames(data[5:])
+    part = types.Part.model_validate_json(frames[0])
+    if len(frames) == 3:
+        part.inline_data = types.Blob.model_validate_json(frames[1])
+        part.inline_data.data = frames[2]
+    return part
+
+
+class SessionSnapshotter:
+    """
+    Snapshots the sessions and artifacts of the in-memory services and restores them.
+
+    Only sessions that changed since the previous snapshot are written, and each
+    artifact version is written once. Sessions are serialized on the event loop, which
+    keeps the copy consistent. Artifact versions are immutable, so only references to
+    the new ones are collected on the loop; they are encoded, along with compression
+    and file I/O, in a worker thread. Snapshots never overlap.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        session_service: InMemorySessionService,
+        artifact_service: BaseArtifactService,
+        interval_s: float = 30.0,
+    ):
+        self.directory = directory
+        self.session_service = session_service
+        self.artifact_service = artifact_service
+        self.interval_s = interval_s
+        self._written: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+        self._written_state: Optional[bytes] = None
+        self._written_versions: Dict[str, Set[int]] = {}
+        self._restoring: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "snapshots": 0,
+            "last_snapshot_ms": None,
+            "last_sessions_written": 0,
+            "last_bytes_written": 0,
+            "last_artifact_versions_written": 0,
+            "state_restore_ms": None,
+            "sessions_restored": 0,
+            "total_restore_ms": 0.0,
+            "max_restore_ms": 0.0,
+        }
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, app_name: str, user_id: str, session_id: str) -> str:
+        return os.path.join(
+            self.directory,
+            _encode_name(app_name),
+            _encode_name(user_id),
+            f"{_encode_name(session_id)}.snap",
+        )
+
+    @staticmethod
+    def _write_file(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _artifact_dir(
+        self, app_name: str, user_id: str, session_id: str, filename: str
+    ) -> str:
+        if filename.startswith("user:"):
+            parent = USER_ARTIFACTS_DIRNAME
+        else:
+            parent = f"{_encode_name(session_id)}.artifacts"
+        return os.path.join(
+            self.directory,
+            _encode_name(app_name),
+            _encode_name(user_id),
+            parent,
+            _encode_name(filename),
+        )
+
+    async def _new_artifact_versions(
+        self, app_name: str, user_id: str, session_id: str
+    ) -> Tuple[List[str], List[Tuple[str, int, types.Part]]]:
+        """
+        Lists the artifacts visible to a session and collects the versions that
+        haven't been written yet, as (directory, version, part) references.
+        """
+        service = self.artifact_service
+        filenames = await service.list_artifact_keys(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        new_versions = []
+        for filename in filenames:
+            directory = self._artifact_dir(app_name, user_id, session_id, filename)
+            written = self._written_versions.get(directory, set())
+            for version in await service.list_versions(
+                app_name=app_name,
+                user_id=user_id,
+                filename=filename,
+                session_id=session_id,
+            ):
+                if version in written:
+                    continue
+                part = await service.load_artifact(
+                    app_name=app_name,
+                    user_id=user_id,
+                    filename=filename,
+                    session_id=session_id,
+                    version=version,
+                )
+                new_versions.append((directory, version, part))
+        return filenames, new_versions
+
+    def _state_json(self) -> bytes:
+        """Serializes app and user state, which the session service keeps apart from sessions."""
+        return json.dumps(
+            {
+                "app_state": self.session_service.app_state,
+                "user_state": self.session_service.user_state,
+            },
+            default=str,
+        ).encode("utf-8")
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Writes every session that changed since the previous snapshot."""
+        async with self._lock:
+            return await self._snapshot()
+
+    async def _snapshot(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        pending: List[Tuple[str, bytes, List[str]]] = []
+        new_versions: Dict[Tuple[str, int], types.Part] = {}
+        markers: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+
+        for app_name, users in list(self.session_service.sessions.items()):
+            for user_id, sessions in list(users.items()):
+                for session_id, session in list(sessions.items()):
+                    key = (app_name, user_id, session_id)
+                    marker = (session.last_update_time, len(session.events))
+                    if self._written.get(key) == marker:
+                        continue
+                    session_json = session.model_dump_json(exclude_none=True).encode(
+                        "utf-8"
+                    )
+                    filenames, versions = await self._new_artifact_versions(*key)
+                    # User-namespaced versions are shared by the user's sessions
+                    for directory, version, part in versions:
+                        new_versions[(directory, version)] = part
+                    pending.append((self._path(*key), session_json, filenames))
+                    markers[key] = marker
+
+        state = self._state_json()
+        write_state = state != self._written_state
+
+        def write() -> int:
+            written = 0
+            for (directory, version), part in new_versions.items():
+                # Deleted or empty versions load as None and are skipped
+                if part is not None:
+                    data = encode_artifact(part)
+                    self._write_file(os.path.join(directory, f"{version}.part"), data)
+                    written += len(data)
+            for path, session_json, filenames in pending:
+                data = encode_snapshot(session_json, filenames)
+                self._write_file(path, data)
+                written += len(data)
+            if write_state:
+                self._write_file(os.path.join(self.directory, STATE_FILENAME), state)
+                written += len(state)
+            return written
+
+        bytes_written = await asyncio.to_thread(write)
+        self._written.update(markers)
+        for directory, version in new_versions:
+            self._written_versions.setdefault(directory, set()).add(version)
+        if write_state:
+            self._written_state = state
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.update(
+            snapshots=self.stats["snapshots"] + 1,
+            last_snapshot_ms=round(elapsed_ms, 2),
+            last_sessions_written=len(pending),
+            last_bytes_written=bytes_written,
+            last_artifact_versions_written=len(new_versions),
+        )
+        if pending:
+            logger.info(
+                f"Snapshot wrote {len(pending)} sessions and {len(new_versions)} "
+                f"artifact versions ({bytes_written} bytes) in {elapsed_ms:.1f} ms"
+            )
+        return self.stats
+
+    def restore_state(self) -> None:
+        """Restores app and user state. Sessions themselves are restored lazily."""
+        started = time.perf_counter()
+        path = os.path.join(self.directory, STATE_FILENAME)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = json.loads(f.read())
+            self.session_service.app_state.update(state.get("app_state", {}))
+            for app_name, users in state.get("user_state", {}).items():
+                self.session_service.user_state.setdefault(app_name, {}).update(users)
+            self._written_state = self._state_json()
+        self.stats["state_restore_ms"] = round(
+            (time.perf_counter() - started) * 1000, 2
+        )
+
+    async def restore_session(
+        self, app_name: str, user_id: str, session_id: str
+    ) -> bool:
+        """
+        Loads one session and its artifacts from disk into the in-memory services.
+
+        Returns:
+            bool: True if a snapshot of the session was found and restored.
+        """
+        key = (app_name, user_id, session_id)
+        if key not in self._restoring:
+            self._restoring[key] = asyncio.create_task(self._restore(key))
+        try:
+            return await asyncio.shield(self._restoring[key])
+        finally:
+            self._restoring.pop(key, None)
+
+    def _read_artifacts(
+        self, key: Tuple[str, str, str], filenames: List[str]
+    ) -> Dict[str, List[types.Part]]:
+        """Reads the written versions of each artifact, in version order."""
+        artifacts: Dict[str, List[types.Part]] = {}
+        for filename in filenames:
+            directory = self._artifact_dir(*key, filename)
+            versions = sorted(
+                int(name[: -len(".part")])
+                for name in (os.listdir(directory) if os.path.isdir(directory) else [])
+                if name.endswith(".part")
+            )
+            parts = []
+            for index, version in enumerate(versions):
+                path = os.path.join(directory, f"{version}.part")
+                with open(path, "rb") as f:
+                    parts.append(decode_artifact(f.read()))
+                # Deleted versions aren't written, so the restored versions are
+                # renumbered; keep the files in step with the new numbers
+                if index != version:
+                    os.replace(path, os.path.join(directory, f"{index}.part"))
+            artifacts[filename] = parts
+        return artifacts
+
+    async def _restore(self, key: Tuple[str, str, str]) -> bool:
+        started = time.perf_counter()
+        path = self._path(*key)
+
+        def read():
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                session, filenames = decode_snapshot(f.read())
+            return session, self._read_artifacts(key, filenames)
+
+        try:
+            restored = await asyncio.to_thread(read)
+        except Exception as e:
+            logger.error(f"Failed to restore session snapshot {path}: {e}")
+            return False
+        if restored is None:
+            return False
+
+        session, artifacts = restored
+        app_name, user_id, session_id = key
+        sessions = self.session_service.sessions.setdefault(app_name, {}).setdefault(
+            user_id, {}
+        )
+        if session_id in sessions:
+            # Created or restored concurrently, the in-memory copy wins
+            return True
+        sessions[session_id] = session
+        self._written[key] = (session.last_update_time, len(session.events))
+        await self._restore_artifacts(app_name, user_id, session_id, artifacts)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["sessions_restored"] += 1
+        self.stats["total_restore_ms"] = round(
+            self.stats["total_restore_ms"] + elapsed_ms, 2
+        )
+        self.stats["max_restore_ms"] = round(
+            max(self.stats["max_restore_ms"], elapsed_ms), 2
+        )
+        logger.info(f"Restored session {session_id} in {elapsed_ms:.1f} ms")
+        return True
+
+    async def _restore_artifacts(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        artifacts: Dict[str, List[types.Part]],
+    ) -> None:
+        """
+        Saves the versions of each snapshotted artifact, in order. Artifacts the service
+        already has are left alone, which covers user-namespaced artifacts restored
+        with another session of the same user. Restored versions are on disk already,
+        so they are marked as written.
+        """
+        service = self.artifact_service
+        for filename, parts in artifacts.items():
+            if await service.list_versions(
+                app_name=app_name,
+                user_id=user_id,
+                filename=filename,
+                session_id=session_id,
+            ):
+                continue
+            directory = self._artifact_dir(app_name, user_id, session_id, filename)
+            self._written_versions[directory] = set(range(len(parts)))
+            for part in parts:
+                await service.save_artifact(
+                    app_name=app_name,
+                    user_id=user_id,
+                    filename=filename,
+                    artifact=part,
+                    session_id=session_id,
+                )
+
+    def snapshotted_sessions(
+        self, app_name: str, user_id: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Lists the (user_id, session_id) pairs that have a snapshot on disk, for one user
+        or, when user_id is None, for every user of the app.
+        """
+        app_dir = os.path.join(self.directory, _encode_name(app_name))
+        if user_id is not None:
+            user_dirs = [_encode_name(user_id)]
+        elif os.path.isdir(app_dir):
+            user_dirs = os.listdir(app_dir)
+        else:
+            user_dirs = []
+
+        found = []
+        for user_dir in user_dirs:
+            path = os.path.join(app_dir, user_dir)
+            if not os.path.isdir(path):
+                continue
+            found.extend(
+                (_decode_name(user_dir), _decode_name(filename[: -len(".snap")]))
+                for filename in os.listdir(path)
+                if filename.endswith(".snap")
+            )
+        return found
+
+    def forget_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """Deletes the snapshot of a session and its session-scoped artifacts."""
+        self._written.pop((app_name, user_id, session_id), None)
+        try:
+            os.remove(self._path(app_name, user_id, session_id))
+        except FileNotFoundError:
+            pass
+        artifacts_dir = os.path.join(
+            self.directory,
+            _encode_name(app_name),
+            _encode_name(user_id),
+            f"{_encode_name(session_id)}.artifacts",
+        )
+        shutil.rmtree(artifacts_dir, ignore_errors=True)
+        for directory in list(self._written_versions):
+            if directory.startswith(artifacts_dir + os.sep):
+                del self._written_versions[directory]
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                try:
+                    await self.snapshot()
+                except Exception as e:
+                    logger.error(f"Session snapshot failed: {e}")
+
+    def start(self) -> None:
+        """Restores app and user state and starts periodic snapshots."""
+        self.restore_state()
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops periodic snapshots and writes a final one. A periodic snapshot in
+        progress is allowed to finish first, so both never write the same file.
+        """
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.snapshot()
+
+
+class SnapshotSessionService(InMemorySessionService):
+    """
+    InMemorySessionService that falls back to the snapshot on disk for sessions it
+    doesn't hold, so sessions are restored one at a time as they are used.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.snapshotter: Optional[SessionSnapshotter] = None
+
+    def _in_memory(self, app_name: str, user_id: str, session_id: str) -> bool:
+        return session_id in self.sessions.get(app_name, {}).get(user_id, {})
+
+    async def get_session(
+        self, *, app_name: str, user_id: str, session_id: str, **kwargs
+    ) -> Optional[Session]:
+        if self.snapshotter and not self._in_memory(app_name, user_id, session_id):
+            await self.snapshotter.restore_session(app_name, user_id, session_id)
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, **kwargs
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None, **kwargs
+    ):
+        if self.snapshotter:
+            for snapshot_user_id, session_id in self.snapshotter.snapshotted_sessions(
+                app_name, user_id
+            ):
+                if not self._in_memory(app_name, snapshot_user_id, session_id):
+                    await self.snapshotter.restore_session(
+                        app_name, snapshot_user_id, session_id
+                    )
+        return await super().list_sessions(app_name=app_name, user_id=user_id, **kwargs)
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str, **kwargs
+    ) -> None:
+        if self.snapshotter:
+            self.snapshotter.forget_session(app_name, user_id, session_id)
+        await super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, **kwargs
+        )
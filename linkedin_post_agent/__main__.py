@@ -63,8 +63,13 @@ async def main():
     agent_instance = root_agent
     logger.info(f"Initializing {agent_instance.name} A2A server...")
 
-    # Create the task manager with the agent instance
-    task_manager = TaskManager(agent=agent_instance)
+    # Create the task manager with the agent instance, snapshotting sessions if configured.
+    # Its background work is started and stopped with the server.
+    task_manager = TaskManager(
+        agent=agent_instance,
+        snapshot_dir=os.getenv("SESSION_SNAPSHOT_DIR") or None,
+        snapshot_interval_s=float(os.getenv("SESSION_SNAPSHOT_INTERVAL_S", 30)),
+    )
 
     # Set up the host and port for the A2A server
     host = os.getenv("LINKEDIN_POST_AGENT_A2A_HOST")
@@ -1,5 +1,5 @@
 from google.adk.agents import LlmAgent
-from .constants import GEMINI_MODEL
+from .model_router import routed_model
 from .prompt import LINKEDIN_POST_AGENT_PROMPT
 
 from .sub_agents.story_agent import story_agent
@@ -11,7 +11,7 @@ from .sub_agents.image_agent import image_agent
 linkedin_post_agent = LlmAgent(
     name="linkedin_post_agent",
     description="A manager agent that orchestrates the LinkedIn post generation process.",
-    model=GEMINI_MODEL,
+    model=routed_model("linkedin_post_agent", "orchestration"),
     instruction=LINKEDIN_POST_AGENT_PROMPT,
     sub_agents=[story_agent, hashtag_agent, post_agent, image_agent],
 )
@@ -1,2 +1,33 @@
 GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
-IMAGE_GENERATION_MODEL = "gemini-2.0-flash-preview-image-generation"
\ No newline at end of file
+IMAGE_GENERATION_MODEL = "gemini-2.0-flash-preview-image-generation"
+
+# Hashtag engine mode: "llm" always asks hashtag_agent, "local" always answers from the
+# local hashtag index, "auto" answers locally and falls back to hashtag_agent when the
+# index's confidence is below HASHTAG_ENGINE_MIN_CONFIDENCE.
+# Both can be overridden with environment variables of the same name.
+HASHTAG_ENGINE_MODE = "auto"
+HASHTAG_ENGINE_MIN_CONFIDENCE = 0.5
+HASHTAG_ENGINE_LIMIT = 6
+
+# Model routing: the model and fallback model used for each phase of the pipeline.
+# Override per phase with MODEL_<PHASE> and FALLBACK_MODEL_<PHASE> environment variables,
+# e.g. MODEL_HASHTAGS=gemini-2.0-flash-lite. An empty fallback disables failover.
+GEMINI_FALLBACK_MODEL = "gemini-2.0-flash"
+GEMINI_LITE_MODEL = "gemini-2.0-flash-lite"
+MODEL_ROUTES = {
+    "orchestration": {"model": GEMINI_MODEL, "fallback": GEMINI_FALLBACK_MODEL},
+    "story": {"model": GEMINI_MODEL, "fallback": GEMINI_FALLBACK_MODEL},
+    "hashtags": {"model": GEMINI_FALLBACK_MODEL, "fallback": GEMINI_LITE_MODEL},
+    "post": {"model": GEMINI_MODEL, "fallback": GEMINI_FALLBACK_MODEL},
+    "image": {"model": GEMINI_MODEL, "fallback": GEMINI_FALLBACK_MODEL},
+}
+
+# A primary model is skipped in favour of its fallback once it has at least
+# MODEL_ROUTER_MIN_SAMPLES calls in the last MODEL_ROUTER_WINDOW_S seconds and its p95
+# latency or error rate crosses these thresholds. Calls slower than
+# MODEL_ROUTER_TIMEOUT_S count as timeouts and are retried on the fallback.
+MODEL_ROUTER_P95_MS = 20000
+MODEL_ROUTER_TIMEOUT_S = 60
+MODEL_ROUTER_MAX_ERROR_RATE = 0.2
+MODEL_ROUTER_MIN_SAMPLES = 5
+MODEL_ROUTER_WINDOW_S = 300
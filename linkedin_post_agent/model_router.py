@@ -0,0 +1,276 @@
+"""
+Model Router for the LinkedIn Post Agent
+This module routes each agent's LLM calls to a per-phase model, tracks rolling latency
+and error rates per model, and fails over to a faster fallback model when the primary
+model is slow or failing.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Tuple
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse, LLMRegistry
+
+from .constants import (
+    MODEL_ROUTES,
+    MODEL_ROUTER_P95_MS,
+    MODEL_ROUTER_TIMEOUT_S,
+    MODEL_ROUTER_MAX_ERROR_RATE,
+    MODEL_ROUTER_MIN_SAMPLES,
+    MODEL_ROUTER_WINDOW_S,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStats:
+    """
+    Rolling window of call outcomes for one model.
+    """
+
+    def __init__(self, window_s: float, max_samples: int = 500):
+        self.window_s = window_s
+        self.samples: deque = deque(maxlen=max_samples)
+
+    def record(self, latency_s: float, outcome: str) -> None:
+        """Records a call that finished with outcome "ok", "error" or "timeout"."""
+        self.samples.append((time.monotonic(), latency_s, outcome))
+
+    def _recent(self) -> list:
+        cutoff = time.monotonic() - self.window_s
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return list(self.samples)
+
+    def summary(self) -> Dict[str, Any]:
+        samples = self._recent()
+        latencies = sorted(
+            latency for _, latency, outcome in samples if outcome == "ok"
+        )
+        failures = sum(1 for _, _, outcome in samples if outcome != "ok")
+        p95 = (
+            latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            if latencies
+            else None
+        )
+        return {
+            "samples": len(samples),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(failures / len(samples), 3) if samples else 0.0,
+            "timeouts": sum(1 for _, _, outcome in samples if outcome == "timeout"),
+        }
+
+
+class ModelRouter:
+    """
+    Chooses the model for each phase and keeps per-model health statistics.
+
+    A phase's primary model is considered unhealthy once it has at least
+    `min_samples` recent calls and either its p95 latency exceeds `p95_ms` or its
+    error/timeout rate exceeds `max_error_rate`. Unhealthy primaries are skipped in
+    favour of the phase's fallback until their samples age out of the window, after
+    which the primary is tried again.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Dict[str, Optional[str]]],
+        p95_ms: float,
+        timeout_s: float,
+        max_error_rate: float,
+        min_samples: int,
+        window_s: float,
+        llm_factory: Callable[[str], BaseLlm] = LLMRegistry.new_llm,
+    ):
+        self.routes = routes
+        self.p95_ms = p95_ms
+        self.timeout_s = timeout_s
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.window_s = window_s
+        self.llm_factory = llm_factory
+        self._stats: Dict[str, ModelStats] = {}
+        self._llms: Dict[str, BaseLlm] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """
+        Builds a router from MODEL_ROUTES, overridden per phase by the MODEL_<PHASE>
+        and FALLBACK_MODEL_<PHASE> environment variables.
+        """
+        routes = {}
+        for phase, route in MODEL_ROUTES.items():
+            routes[phase] = {
+                "model": os.getenv(f"MODEL_{phase.upper()}", route["model"]),
+                "fallback": os.getenv(
+                    f"FALLBACK_MODEL_{phase.upper()}", route["fallback"]
+                )
+                or None,
+            }
+        return cls(
+            routes=routes,
+            p95_ms=float(os.getenv("MODEL_ROUTER_P95_MS", MODEL_ROUTER_P95_MS)),
+            timeout_s=float(
+                os.getenv("MODEL_ROUTER_TIMEOUT_S", MODEL_ROUTER_TIMEOUT_S)
+            ),
+            max_error_rate=float(
+                os.getenv("MODEL_ROUTER_MAX_ERROR_RATE", MODEL_ROUTER_MAX_ERROR_RATE)
+            ),
+            min_samples=int(
+                os.getenv("MODEL_ROUTER_MIN_SAMPLES", MODEL_ROUTER_MIN_SAMPLES)
+            ),
+            window_s=float(os.getenv("MODEL_ROUTER_WINDOW_S", MODEL_ROUTER_WINDOW_S)),
+        )
+
+    def stats(self, model: str) -> ModelStats:
+        if model not in self._stats:
+            self._stats[model] = ModelStats(self.window_s)
+        return self._stats[model]
+
+    def llm(self, model: str) -> BaseLlm:
+        """Returns the (cached) LLM client for a model name."""
+        if model not in self._llms:
+            self._llms[model] = self.llm_factory(model)
+        return self._llms[model]
+
+    def unhealthy_reason(self, model: str) -> Optional[str]:
+        """Explains why a model should be avoided, or returns None if it is healthy."""
+        summary = self.stats(model).summary()
+        if summary["samples"] < self.min_samples:
+            return None
+        if summary["error_rate"] > self.max_error_rate:
+            return f"error rate {summary['error_rate']:.0%} > {self.max_error_rate:.0%}"
+        if summary["p95_ms"] is not None and summary["p95_ms"] > self.p95_ms:
+            return f"p95 {summary['p95_ms']:.0f} ms > {self.p95_ms:.0f} ms"
+        return None
+
+    def choose(self, phase: str) -> Tuple[str, Optional[str], str]:
+        """
+        Picks the model for a phase.
+
+        Returns:
+            Tuple[str, Optional[str], str]: The chosen model, the model to fail over to
+            if the call fails (None if there is none), and the reason for the choice.
+        """
+        route = self.routes[phase]
+        primary, fallback = route["model"], route["fallback"]
+        if not fallback or fallback == primary:
+            return primary, None, "primary"
+
+        reason = self.unhealthy_reason(primary)
+        if reason and not self.unhealthy_reason(fallback):
+            logger.warning(f"Routing {phase} to {fallback}: {primary} {reason}")
+            return fallback, None, f"primary unhealthy: {reason}"
+        return primary, fallback, "primary"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarizes routes and per-model health, e.g. for diagnostics."""
+        return {
+            "routes": self.routes,
+            "models": {model: stats.summary() for model, stats in self._stats.items()},
+        }
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Returns the process-wide router, built from the environment on first use so that
+    values loaded from .env are honoured.
+    """
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter.from_env()
+    return _model_router
+
+
+class RoutedLlm(BaseLlm):
+    """
+    LLM wrapper that lets the ModelRouter pick the model for every call of an agent.
+
+    Each response carries the routing decision in its custom_metadata under
+    "model_routing", so it shows up on the resulting events.
+    """
+
+    phase: str
+    agent_name: str
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        router = get_model_router()
+        model, fallback, reason = router.choose(self.phase)
+        primary = router.routes[self.phase]["model"]
+
+        while model:
+            decision = {
+                "agent": self.agent_name,
+                "phase": self.phase,
+                "model": model,
+                "primary": primary,
+                "reason": reason,
+            }
+            llm_request.model = model
+            responses = router.llm(model).generate_content_async(
+                llm_request, stream=stream
+            )
+            # Only the time spent awaiting the model counts as its latency. While this
+            # generator is paused at `yield`, the caller runs tools and sub-agents.
+            elapsed = 0.0
+            outcome: Optional[str] = None
+            yielded = False
+            try:
+                while True:
+                    started = time.monotonic()
+                    try:
+                        response = await asyncio.wait_for(
+                            responses.__anext__(), timeout=router.timeout_s
+                        )
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        elapsed += time.monotonic() - started
+                    response.custom_metadata = {
+                        **(response.custom_metadata or {}),
+                        "model_routing": decision,
+                    }
+                    yielded = True
+                    yield response
+                outcome = "ok"
+                return
+            except GeneratorExit:
+                # Closed early by the caller, e.g. after a transfer to another agent
+                outcome = "ok"
+                raise
+            except Exception as e:
+                outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                # Only fail over before anything was streamed to the caller
+                if yielded or not fallback:
+                    raise
+                logger.warning(
+                    f"{self.agent_name} call to {model} failed with {outcome}, "
+                    f"failing over to {fallback}"
+                )
+            finally:
+                # Cancellation leaves outcome unset, it says nothing about the model
+                if outcome is not None:
+                    router.stats(model).record(elapsed, outcome)
+            model, fallback, reason = fallback, None, f"failover after {outcome}"
+
+
+def routed_model(agent_name: str, phase: str) -> RoutedLlm:
+    """
+    Creates the model for an agent, routed according to its phase.
+
+    Args:
+        agent_name (str): Name of the agent the model is for, reported in metadata.
+        phase (str): Key into MODEL_ROUTES.
+    """
+    return RoutedLlm(
+        model=MODEL_ROUTES[phase]["model"], phase=phase, agent_name=agent_name
+    )
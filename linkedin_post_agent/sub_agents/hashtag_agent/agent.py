@@ -1,11 +1,13 @@
 from google.adk.agents import LlmAgent
-from ...constants import GEMINI_MODEL
+from ...model_router import routed_model
 from .prompt import HASHTAG_AGENT_PROMPT
+from .callbacks import local_hashtag_fast_path
 
 
 hashtag_agent = LlmAgent(
     name="hashtag_agent",
     description="Hashtag Generator specialized in creating relevant and optimized hashtags for LinkedIn posts.",
     instruction=HASHTAG_AGENT_PROMPT,
-    model=GEMINI_MODEL,
+    model=routed_model("hashtag_agent", "hashtags"),
+    before_agent_callback=local_hashtag_fast_path,
 )
@@ -0,0 +1,112 @@
+"""
+Callbacks for the hashtag_agent
+This module short-circuits hashtag_agent with the local hashtag index when it is
+confident enough, so the common case doesn't pay for an LLM round-trip.
+"""
+
+import os
+import hashlib
+import logging
+from typing import List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from ...constants import (
+    HASHTAG_ENGINE_MODE,
+    HASHTAG_ENGINE_MIN_CONFIDENCE,
+    HASHTAG_ENGINE_LIMIT,
+)
+from .hashtag_index import get_default_index
+
+
+logger = logging.getLogger(__name__)
+
+
+def _collect_text(callback_context: CallbackContext) -> str:
+    """
+    Gathers the topic, behind story and post written so far.
+
+    The topic is taken from the user messages sent before story_agent first replied.
+    Later user messages are confirmations or change requests, whose wording ("looks
+    good", "I confirm") would otherwise skew the picks.
+    """
+    texts: List[str] = []
+    for event in callback_context.session.events:
+        if event.author == "story_agent":
+            break
+        if event.author == "user" and event.content and event.content.parts:
+            texts.extend(part.text for part in event.content.parts if part.text)
+
+    for key in ("behind_story", "linkedin_post"):
+        value = callback_context.state.get(key)
+        if value:
+            texts.append(str(value))
+    return "\n".join(texts)
+
+
+def local_hashtag_fast_path(
+    callback_context: CallbackContext,
+) -> Optional[types.Content]:
+    """
+    Answers with hashtags from the local index instead of running hashtag_agent.
+
+    The local index is consulted once per behind story. Follow-up turns (confirmation
+    or requested changes) and low-confidence suggestions fall through to the LLM so it
+    can refine the hashtags or delegate to post_agent.
+
+    Returns:
+        Optional[types.Content]: The hashtag suggestion to present to the user, or None
+        to let hashtag_agent run as usual.
+    """
+    mode = os.getenv("HASHTAG_ENGINE_MODE", HASHTAG_ENGINE_MODE).lower()
+    if mode == "llm":
+        return None
+
+    # Only one local answer per behind story, keyed by its digest
+    story = str(callback_context.state.get("behind_story", ""))
+    story_key = hashlib.sha1(story.encode("utf-8")).hexdigest()
+    if callback_context.state.get("hashtag_engine_story_key") == story_key:
+        return None
+    callback_context.state["hashtag_engine_story_key"] = story_key
+
+    min_confidence = float(
+        os.getenv("HASHTAG_ENGINE_MIN_CONFIDENCE", HASHTAG_ENGINE_MIN_CONFIDENCE)
+    )
+    suggestion = get_default_index().suggest(
+        _collect_text(callback_context), limit=HASHTAG_ENGINE_LIMIT
+    )
+    if not suggestion["hashtags"] or (
+        mode == "auto" and suggestion["confidence"] < min_confidence
+    ):
+        logger.info(
+            f"Local hashtag confidence {suggestion['confidence']:.2f} is too low, "
+            "falling back to hashtag_agent"
+        )
+        callback_context.state["hashtag_engine"] = {
+            "source": "llm",
+            "confidence": suggestion["confidence"],
+        }
+        return None
+
+    logger.info(
+        f"Serving hashtags from local index with confidence {suggestion['confidence']:.2f}"
+    )
+    callback_context.state["hashtags"] = suggestion["hashtags"]
+    callback_context.state["hashtag_engine"] = {
+        "source": "local",
+        "confidence": suggestion["confidence"],
+        "scores": suggestion["scores"],
+    }
+    return types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                text=(
+                    "Here are the suggested hashtags for your post:\n\n"
+                    f"{' '.join(suggestion['hashtags'])}\n\n"
+                    "Would you like to use these hashtags, or should I adjust them?"
+                )
+            )
+        ],
+    )
@@ -0,0 +1,265 @@
+"""
+Local Hashtag Index for the LinkedIn Post Agent
+This module provides a BM25-ranked inverted index over a curated hashtag vocabulary,
+used as a fast path ahead of the LLM-backed hashtag_agent.
+"""
+
+import os
+import re
+import json
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+# Default vocabulary shipped with the agent
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), "hashtags.json")
+
+# Words that carry no topical signal for hashtag selection
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no
+    nor not now of off on once only or other our ours ourselves out over own same
+    she should so some such than that the their theirs them themselves then there
+    these they this those through to too under until up very was we were what when
+    where which while who whom why will with would you your yours yourself
+    yourselves really get got one like want wanted post linkedin share sharing
+    first new lot time day today week things thing
+    yes ok okay sure please thanks look looks good great fine perfect confirm
+    confirmed proceed go ahead
+    """.split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+]*")
+_CAMEL_CASE_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+# Suffixes and their replacements, tried longest first and stripped repeatedly so that
+# every form of a word reduces to the same stem
+_SUFFIX_RULES = (
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ments", ""),
+    ("ment", ""),
+    ("ings", ""),
+    ("ing", ""),
+    ("ies", "y"),
+    ("ers", ""),
+    ("er", ""),
+    ("ed", ""),
+    ("es", ""),
+    ("s", ""),
+)
+_MIN_STEM_LENGTH = 3
+
+
+def _stem(token: str) -> str:
+    """
+    Reduces a word to its stem, so that 'engineer', 'engineers' and 'engineering' all
+    become 'engin', and 'manager', 'managing' and 'management' become 'manag'.
+    """
+    while True:
+        for suffix, replacement in _SUFFIX_RULES:
+            if (
+                not token.endswith(suffix)
+                or len(token) - len(suffix) < _MIN_STEM_LENGTH
+            ):
+                continue
+            # Keep the final 's' of words like 'business', 'status' and 'analysis'
+            if suffix == "s" and token[-2] in "sui":
+                continue
+            token = token[: -len(suffix)] + replacement
+            break
+        else:
+            break
+    if token.endswith("e") and len(token) > _MIN_STEM_LENGTH:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases, splits and stems text, dropping stopwords."""
+    return [
+        _stem(token)
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def split_hashtag(tag: str) -> List[str]:
+    """Splits a CamelCase hashtag such as 'MachineLearning' into its words."""
+    return _CAMEL_CASE_PATTERN.findall(tag.lstrip("#"))
+
+
+class HashtagIndex:
+    """
+    Inverted index over hashtag entries scored with Okapi BM25.
+
+    Each hashtag is a document made of the words in its name plus its curated
+    keywords. Queries are free text (topic, behind story, post) and are scored
+    term-at-a-time against the postings, so lookups only touch hashtags that
+    share at least one term with the query.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._tags: List[str] = []
+        self._tag_ids: Dict[str, int] = {}
+        self._doc_lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._idf: Dict[str, float] = {}
+        self._avg_doc_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_VOCABULARY_PATH) -> "HashtagIndex":
+        """
+        Builds an index from a JSON vocabulary file.
+
+        The file holds a list of objects with a "tag" and an optional list of "keywords".
+        """
+        index = cls()
+        index.load(path)
+        return index
+
+    def load(self, path: str) -> None:
+        """Adds or updates every entry of a JSON vocabulary file."""
+        with open(path, "r") as f:
+            entries = json.load(f)
+        for entry in entries:
+            self.add(entry["tag"], entry.get("keywords", []), reindex=False)
+        self.reindex()
+
+    def add(self, tag: str, keywords: Iterable[str] = (), reindex: bool = True) -> None:
+        """
+        Adds a hashtag to the vocabulary, replacing its keywords if it already exists.
+
+        Args:
+            tag (str): The hashtag, with or without the leading '#'.
+            keywords (Iterable[str]): Words and phrases the hashtag should match.
+            reindex (bool): Recompute IDF statistics immediately. Pass False when
+            adding entries in bulk and call `reindex` once at the end.
+        """
+        tag = tag.lstrip("#")
+        terms = tokenize(" ".join(split_hashtag(tag)))
+        for keyword in keywords:
+            terms.extend(tokenize(keyword))
+        term_counts = Counter(terms)
+
+        tag_id = self._tag_ids.get(tag.lower())
+        if tag_id is None:
+            tag_id = len(self._tags)
+            self._tag_ids[tag.lower()] = tag_id
+            self._tags.append(tag)
+            self._doc_lengths.append(0)
+        else:
+            for postings in self._postings.values():
+                postings.pop(tag_id, None)
+
+        self._doc_lengths[tag_id] = sum(term_counts.values())
+        for term, count in term_counts.items():
+            self._postings[term][tag_id] = count
+
+        if reindex:
+            self.reindex()
+
+    def reindex(self) -> None:
+        """Recomputes the IDF table and average document length."""
+        total = len(self._tags)
+        self._postings = defaultdict(
+            dict, {term: docs for term, docs in self._postings.items() if docs}
+        )
+        self._idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+        self._avg_doc_length = sum(self._doc_lengths) / total if total else 0.0
+
+    def search(self, text: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Ranks hashtags against free text.
+
+        Args:
+            text (str): The text to match, usually topic, behind story and post combined.
+            limit (int): Maximum number of hashtags to return.
+
+        Returns:
+            List[Tuple[str, float]]: Hashtags (with '#') and their BM25 scores, best first.
+        """
+        query = Counter(tokenize(text))
+        scores: Dict[int, float] = defaultdict(float)
+        for term, query_count in query.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            # Dampen repeated query terms so one word repeated in a long story doesn't dominate
+            query_weight = 1 + math.log(query_count)
+            for tag_id, term_count in postings.items():
+                norm = self.k1 * (
+                    1
+                    - self.b
+                    + self.b * self._doc_lengths[tag_id] / self._avg_doc_length
+                )
+                scores[tag_id] += (
+                    query_weight
+                    * idf
+                    * term_count
+                    * (self.k1 + 1)
+                    / (term_count + norm)
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(f"#{self._tags[tag_id]}", score) for tag_id, score in ranked[:limit]]
+
+    def suggest(
+        self,
+        text: str,
+        limit: int = 6,
+        min_score: float = 3.0,
+        relative_cutoff: float = 0.25,
+    ) -> Dict[str, Any]:
+        """
+        Suggests hashtags for the given text along with a confidence estimate.
+
+        Hashtags must clear both `min_score` and `relative_cutoff` times the best
+        score. Confidence is the share of the requested hashtags that survived, so a
+        short or off-vocabulary text yields low confidence and should be handed to
+        the LLM instead.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the ranked "hashtags", their "scores"
+            and the overall "confidence" between 0 and 1.
+        """
+        ranked = self.search(text, limit)
+        if ranked:
+            threshold = max(min_score, ranked[0][1] * relative_cutoff)
+            ranked = [item for item in ranked if item[1] >= threshold]
+        return {
+            "hashtags": [tag for tag, _ in ranked],
+            "scores": {tag: round(score, 3) for tag, score in ranked},
+            "confidence": len(ranked) / limit if limit else 0.0,
+        }
+
+
+_default_index: Optional[HashtagIndex] = None
+
+
+def get_default_index() -> HashtagIndex:
+    """
+    Returns the process-wide hashtag index, building it on first use.
+
+    The vocabulary is read from HASHTAG_VOCABULARY_PATH when set, so it can be
+    updated without touching the code.
+    """
+    global _default_index
+    if _default_index is None:
+        path = os.getenv("HASHTAG_VOCABULARY_PATH") or DEFAULT_VOCABULARY_PATH
+        _default_index = HashtagIndex.from_file(path)
+    return _default_index
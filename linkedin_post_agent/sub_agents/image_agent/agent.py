@@ -1,5 +1,5 @@
 from google.adk.agents import LlmAgent
-from ...constants import GEMINI_MODEL
+from ...model_router import routed_model
 from .prompt import IMAGE_AGENT_PROMPT
 from .tools.create_image import create_image
 
@@ -7,7 +7,7 @@ from .tools.create_image import create_image
 image_agent = LlmAgent(
     name="image_agent",
     description="Image Generator specialized in crafting prompts and creating images that enhance LinkedIn posts.",
-    model=GEMINI_MODEL,
+    model=routed_model("image_agent", "image"),
     instruction=IMAGE_AGENT_PROMPT,
     tools=[create_image],
 )
@@ -1,5 +1,5 @@
 from google.adk.agents import LlmAgent
-from ...constants import GEMINI_MODEL
+from ...model_router import routed_model
 from .prompt import POST_AGENT_PROMPT
 
 
@@ -7,5 +7,6 @@ post_agent = LlmAgent(
     name="post_agent",
     description="Post Generator specialized in generating engaging and professional LinkedIn posts.",
     instruction=POST_AGENT_PROMPT,
-    model=GEMINI_MODEL,
+    output_key="linkedin_post",
+    model=routed_model("post_agent", "post"),
 )
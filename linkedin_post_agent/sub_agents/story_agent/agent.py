@@ -1,11 +1,12 @@
 from google.adk.agents import LlmAgent
-from ...constants import GEMINI_MODEL
+from ...model_router import routed_model
 from .prompt import STORY_AGENT_PROMPT
 
 
 story_agent = LlmAgent(
     name="story_agent",
     description="Generates a compelling first-person behind story for a LinkedIn post.",
-    model=GEMINI_MODEL,
+    model=routed_model("story_agent", "story"),
     instruction=STORY_AGENT_PROMPT,
+    output_key="behind_story",
 )
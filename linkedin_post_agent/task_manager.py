@@ -15,6 +15,8 @@ from google.adk.sessions import InMemorySessionService
 from google.adk.artifacts import InMemoryArtifactService
 from google.genai import types as adk_types
 
+from common.session_snapshot import SessionSnapshotter, SnapshotSessionService
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,15 +29,33 @@ A2A_APP_NAME = "linkedin_a2a_app"
 
 # Task manager class for handling A2A tasks
 class TaskManager:
-    def __init__(self, agent: Agent):
+    def __init__(
+        self,
+        agent: Agent,
+        snapshot_dir: Optional[str] = None,
+        snapshot_interval_s: float = 30.0,
+    ):
         logger.info(f"Initializing TaskManager for Agent: {agent.name}")
 
         self.agent = agent
 
         # Initialize session and artifact services
-        self.session_service = InMemorySessionService()
+        self.session_service = (
+            SnapshotSessionService() if snapshot_dir else InMemorySessionService()
+        )
         self.artifact_service = InMemoryArtifactService()
 
+        # Snapshot sessions to disk so they survive restarts, if a directory is given
+        self.snapshotter: Optional[SessionSnapshotter] = None
+        if snapshot_dir:
+            self.snapshotter = SessionSnapshotter(
+                directory=snapshot_dir,
+                session_service=self.session_service,
+                artifact_service=self.artifact_service,
+                interval_s=snapshot_interval_s,
+            )
+            self.session_service.snapshotter = self.snapshotter
+
         # Create a runner for the agent
         self.runner = Runner(
             agent=self.agent,
@@ -44,6 +64,24 @@ class TaskManager:
             artifact_service=self.artifact_service,
         )
 
+    async def start(self) -> None:
+        """
+        Starts background work: restores snapshotted state and schedules snapshots.
+        """
+        if self.snapshotter:
+            self.snapshotter.start()
+            logger.info(f"Session snapshots enabled in {self.snapshotter.directory}")
+
+    async def stop(self) -> None:
+        """
+        Stops background work, writing a final session snapshot.
+        """
+        if self.snapshotter:
+            await self.snapshotter.stop()
+            logger.info(
+                f"Final session snapshot took {self.snapshotter.stats['last_snapshot_ms']} ms"
+            )
+
     async def process_task(
         self, message: str, context: Dict[str, Any], session_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -51,7 +89,7 @@ class TaskManager:
         Process a task with the given message and context.
         This method retrieves or creates a session, runs the agent with the provided message,
         and returns the results including any new messages, image artifacts, raw events,
-        tool calls, and tool responses.
+        tool calls, tool responses, and model routing decisions.
 
         Args:
             message (str): The message to process.
@@ -62,7 +100,7 @@ class TaskManager:
         Returns:
             Dict[str, Any]: A dictionary containing the results of the task processing,
             including new_message, image_artifacts, raw_events, tool_calls, tool_responses,
-            and session_id.
+            model_routing, and session_id.
         """
         # Get the user_id
         user_id = context.get("user_id", "default_user")
@@ -98,6 +136,7 @@ class TaskManager:
         raw_events = []
         tool_calls = []
         tool_responses = []
+        model_routing = []
 
         try:
             async for event in events:
@@ -135,6 +174,10 @@ class TaskManager:
                             }
                         )
 
+                # Get the model routing decision if the event came from a routed model
+                if event.custom_metadata and "model_routing" in event.custom_metadata:
+                    model_routing.append(event.custom_metadata["model_routing"])
+
                 # Get artifacts changes
                 if event.actions and event.actions.artifact_delta:
                     logger.info(
@@ -155,6 +198,7 @@ class TaskManager:
                     "raw_events": raw_events,
                     "tool_calls": tool_calls,
                     "tool_responses": tool_responses,
+                    "model_routing": model_routing,
                 },
             }
         except Exception as e:
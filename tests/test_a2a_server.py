@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from common.a2a_server import create_agent_server
+
+
+class FakeTaskManager:
+    def __init__(self):
+        self.calls = []
+
+    async def start(self):
+        self.calls.append("start")
+
+    async def stop(self):
+        self.calls.append("stop")
+
+    async def process_task(self, message, context, session_id=None):
+        return {"message": message.upper(), "session_id": session_id or "new"}
+
+
+def test_task_manager_follows_the_server_lifecycle():
+    task_manager = FakeTaskManager()
+    app = create_agent_server("Test", "Test agent", task_manager)
+
+    with TestClient(app) as client:
+        assert task_manager.calls == ["start"]
+        response = client.post("/run", json={"message": "hello", "session_id": "s1"})
+        assert response.json()["message"] == "HELLO"
+    assert task_manager.calls == ["start", "stop"]
+
+
+def test_run_encodes_values_orjson_rejects():
+    class BigNumberTaskManager(FakeTaskManager):
+        async def process_task(self, message, context, session_id=None):
+            return {"message": message, "data": {"big": 2**70}}
+
+    app = create_agent_server("Test", "Test agent", BigNumberTaskManager())
+    with TestClient(app) as client:
+        response = client.post("/run", json={"message": "hello"})
+    assert response.status_code == 200
+    assert response.json()["data"] == {"big": 2**70}
+
+
+def test_profile_tag_with_non_ascii_token_is_ignored(monkeypatch):
+    monkeypatch.setenv("A2A_ADMIN_TOKEN", "secret")
+    app = create_agent_server("Test", "Test agent", FakeTaskManager())
+    with TestClient(app) as client:
+        response = client.post(
+            "/run",
+            json={"message": "hello"},
+            headers={
+                "X-Profile-Tag": "turn-1",
+                "X-Admin-Token": "sécret".encode("latin-1"),
+            },
+        )
+        assert response.status_code == 200
+        profile = client.get(
+            "/debug/profile/requests/turn-1", headers={"X-Admin-Token": "secret"}
+        )
+        assert profile.status_code == 404
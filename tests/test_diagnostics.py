@@ -0,0 +1,86 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from common.diagnostics import Diagnostics, _artifact_owner, create_debug_router
+
+
+ADMIN_TOKEN = "secret"
+
+
+def _task_manager():
+    session_service = InMemorySessionService()
+    artifact_service = InMemoryArtifactService()
+
+    async def populate():
+        await session_service.create_session(
+            app_name="app", user_id="alice", session_id="s1"
+        )
+        await artifact_service.save_artifact(
+            app_name="app",
+            user_id="alice",
+            session_id="s1",
+            filename="post.png",
+            artifact=types.Part.from_bytes(
+                data=b"\x89PNG" * 100, mime_type="image/png"
+            ),
+        )
+        await artifact_service.save_artifact(
+            app_name="app",
+            user_id="alice",
+            filename="user:profile.txt",
+            artifact=types.Part(text="profile"),
+        )
+
+    asyncio.run(populate())
+    return SimpleNamespace(
+        session_service=session_service, artifact_service=artifact_service
+    )
+
+
+def test_artifact_owner():
+    assert _artifact_owner("app/alice/s1/post.png") == ("app", "alice", "s1")
+    assert _artifact_owner("app/alice/user/user:profile.txt") == ("app", "alice", None)
+    assert _artifact_owner("app:alice:s1:post.png") is None
+
+
+def test_session_memory_attributes_artifacts():
+    report = Diagnostics(_task_manager()).session_memory()
+
+    assert report["sessions"] == 1
+    (session,) = report["by_session"]
+    assert session["session_id"] == "s1"
+    assert session["artifact_versions"] == 1
+    assert session["artifact_bytes"] > 400
+    (user_usage,) = report["user_artifacts"]
+    assert (user_usage["user_id"], user_usage["artifact_versions"]) == ("alice", 1)
+
+
+def test_memory_endpoint_requires_admin_token():
+    app = FastAPI()
+    app.include_router(create_debug_router(Diagnostics(_task_manager()), ADMIN_TOKEN))
+    client = TestClient(app)
+
+    assert client.get("/debug/memory/sessions").status_code == 403
+    response = client.get(
+        "/debug/memory/sessions", headers={"X-Admin-Token": ADMIN_TOKEN}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.content)["sessions"] == 1
+
+
+def test_non_ascii_admin_token_is_rejected():
+    app = FastAPI()
+    app.include_router(create_debug_router(Diagnostics(_task_manager()), ADMIN_TOKEN))
+    client = TestClient(app)
+
+    response = client.get(
+        "/debug/memory/sessions", headers={"X-Admin-Token": "sécret".encode("latin-1")}
+    )
+    assert response.status_code == 403
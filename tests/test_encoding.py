@@ -0,0 +1,75 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from common import encoding
+
+
+PAYLOAD = {
+    "message": "Here is your post",
+    "created": datetime(2020, 1, 1, 12, 30, 5, 250, tzinfo=timezone.utc),
+    "naive": datetime(2020, 1, 1),
+    "day": date(2020, 1, 1),
+    "tags": ("#ai", "#ml"),
+    "blob": b"\x00\x01",
+}
+
+
+def test_dumps_json_is_the_same_with_and_without_orjson(monkeypatch):
+    if encoding.orjson is None:
+        pytest.skip("orjson is not installed")
+    with_orjson = encoding.dumps_json(PAYLOAD)
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.dumps_json(PAYLOAD) == with_orjson
+
+
+def test_datetimes_are_iso_8601(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    decoded = encoding.loads(encoding.dumps_json(PAYLOAD))
+    assert decoded["created"] == "2020-01-01T12:30:05.000250+00:00"
+    assert decoded["naive"] == "2020-01-01T00:00:00"
+    assert decoded["day"] == "2020-01-01"
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0, br", None),
+        ("*", encoding.available_encodings()[0]),
+    ],
+)
+def test_select_encoding(accept_encoding, expected):
+    assert encoding.select_encoding(accept_encoding) == expected
+
+
+def test_select_media_type_falls_back_to_json():
+    assert encoding.select_media_type(None) == encoding.JSON_MEDIA_TYPE
+    assert encoding.select_media_type("text/html") == encoding.JSON_MEDIA_TYPE
+
+
+@pytest.mark.parametrize("codec", encoding.available_encodings())
+def test_compress_round_trip(codec):
+    body = encoding.dumps_json(PAYLOAD) * 50
+    assert encoding.decompress(encoding.compress(body, codec), codec) == body
+
+
+def test_encode_response_only_compresses_large_bodies():
+    small = encoding.encode_response({"message": "hi"}, accept_encoding="gzip")
+    assert "content-encoding" not in small.headers
+
+    large_payload = {"message": "x" * 4096}
+    large = encoding.encode_response(
+        large_payload, accept_encoding="gzip", min_size=1024
+    )
+    assert large.headers["content-encoding"] == "gzip"
+    assert encoding.loads(encoding.decompress(large.body, "gzip")) == large_payload
+
+
+def test_dumps_json_handles_values_orjson_rejects():
+    payload = {"data": {"big": 2**70, "when": datetime(2020, 1, 1)}}
+    assert encoding.loads(encoding.dumps_json(payload)) == {
+        "data": {"big": 2**70, "when": "2020-01-01T00:00:00"}
+    }
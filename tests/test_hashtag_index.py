@@ -0,0 +1,169 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# The linkedin_post_agent package loads the image tool, which checks its credentials
+# at import time
+for var in (
+    "GOOGLE_API_KEY",
+    "CLOUDINARY_CLOUD_NAME",
+    "CLOUDINARY_API_KEY",
+    "CLOUDINARY_API_SECRET",
+):
+    os.environ.setdefault(var, "test")
+
+from google.adk.events import Event  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from linkedin_post_agent.sub_agents.hashtag_agent import callbacks  # noqa: E402
+from linkedin_post_agent.sub_agents.hashtag_agent.hashtag_index import (  # noqa: E402
+    HashtagIndex,
+    _stem,
+    tokenize,
+)
+
+
+TOPIC = "Promoted to engineering manager"
+STORY = (
+    "After five years as a software engineer I was promoted to engineering manager. "
+    "Leading a team of developers means fewer pull requests and more one on ones."
+)
+
+
+@pytest.mark.parametrize(
+    "forms, stem",
+    [
+        (("engineer", "engineers", "engineering"), "engin"),
+        (("manager", "managers", "managing", "managed", "management"), "manag"),
+        (("service", "services"), "servic"),
+        (("company", "companies"), "company"),
+        (("automate", "automated", "automation"), "automat"),
+    ],
+)
+def test_every_form_of_a_word_has_the_same_stem(forms, stem):
+    assert {_stem(form) for form in forms} == {stem}
+
+
+@pytest.mark.parametrize("word", ["business", "status", "analysis"])
+def test_final_s_of_singular_words_is_kept(word):
+    assert _stem(word) == word
+
+
+def test_tokenize_drops_stopwords_and_chatter():
+    assert tokenize("Yes, looks good. Thanks, I confirm the story!") == ["story"]
+
+
+def test_search_ranks_word_forms_alike():
+    index = HashtagIndex.from_file()
+    assert index.search("engineer", 3) == index.search("engineering", 3)
+
+
+def test_add_replaces_keywords_of_existing_tag():
+    index = HashtagIndex()
+    index.add("Foo", ["alpha"])
+    index.add("#Bar", ["beta"])
+    index.add("foo", ["gamma"], reindex=False)
+    index.reindex()
+
+    assert len(index) == 2
+    assert index.search("alpha") == []
+    assert [tag for tag, _ in index.search("gamma")] == ["#Foo"]
+    assert [tag for tag, _ in index.search("beta")] == ["#Bar"]
+
+
+def test_suggest_applies_thresholds_and_confidence():
+    index = HashtagIndex.from_file()
+    suggestion = index.suggest(f"{TOPIC}\n{STORY}", limit=6)
+
+    assert "#Leadership" in suggestion["hashtags"]
+    assert suggestion["confidence"] == len(suggestion["hashtags"]) / 6
+    scores = list(suggestion["scores"].values())
+    assert scores == sorted(scores, reverse=True)
+    assert min(scores) >= max(3.0, scores[0] * 0.25) - 0.001
+
+    strict = index.suggest(f"{TOPIC}\n{STORY}", limit=6, min_score=100)
+    assert strict["hashtags"] == [] and strict["confidence"] == 0.0
+
+
+@pytest.mark.parametrize("text", ["", "Yes, looks good, thanks!"])
+def test_suggest_without_signal_has_no_confidence(text):
+    suggestion = HashtagIndex.from_file().suggest(text)
+    assert suggestion == {"hashtags": [], "scores": {}, "confidence": 0.0}
+
+
+def _message(author, text):
+    return Event(
+        author=author,
+        content=types.Content(
+            role="user" if author == "user" else "model",
+            parts=[types.Part(text=text)],
+        ),
+    )
+
+
+def _callback_context(story=STORY, events=None):
+    events = events or [
+        _message("user", TOPIC),
+        _message("story_agent", STORY),
+        _message("user", "Looks good, I confirm the story."),
+    ]
+    return SimpleNamespace(
+        state={"behind_story": story}, session=SimpleNamespace(events=events)
+    )
+
+
+def test_query_leaves_out_replies_after_the_story():
+    text = callbacks._collect_text(_callback_context())
+    assert TOPIC in text and STORY in text
+    assert "confirm" not in text
+
+
+def test_llm_mode_never_answers_locally(monkeypatch):
+    monkeypatch.setenv("HASHTAG_ENGINE_MODE", "llm")
+    context = _callback_context()
+    assert callbacks.local_hashtag_fast_path(context) is None
+    assert "hashtag_engine" not in context.state
+
+
+def test_auto_mode_answers_once_per_story(monkeypatch):
+    monkeypatch.setenv("HASHTAG_ENGINE_MODE", "auto")
+    monkeypatch.setenv("HASHTAG_ENGINE_MIN_CONFIDENCE", "0.3")
+    context = _callback_context()
+
+    content = callbacks.local_hashtag_fast_path(context)
+    assert "#Leadership" in content.parts[0].text
+    assert context.state["hashtag_engine"]["source"] == "local"
+    assert context.state["hashtags"][0].startswith("#")
+
+    # The follow-up turn about the same story goes to the LLM
+    assert callbacks.local_hashtag_fast_path(context) is None
+
+    # A rewritten story gets a local answer again
+    context.state["behind_story"] = STORY + " I'm grateful to my mentors."
+    assert callbacks.local_hashtag_fast_path(context) is not None
+
+
+def test_auto_mode_falls_back_when_confidence_is_low(monkeypatch):
+    monkeypatch.setenv("HASHTAG_ENGINE_MODE", "auto")
+    monkeypatch.setenv("HASHTAG_ENGINE_MIN_CONFIDENCE", "0.9")
+    context = _callback_context(
+        story="My mentor taught me to grow tomatoes.",
+        events=[_message("user", "Weekend gardening")],
+    )
+
+    assert callbacks.local_hashtag_fast_path(context) is None
+    assert context.state["hashtag_engine"]["source"] == "llm"
+    assert "hashtags" not in context.state
+
+
+def test_local_mode_answers_despite_low_confidence(monkeypatch):
+    monkeypatch.setenv("HASHTAG_ENGINE_MODE", "local")
+    monkeypatch.setenv("HASHTAG_ENGINE_MIN_CONFIDENCE", "0.9")
+    context = _callback_context(
+        story="My mentor taught me to grow tomatoes.",
+        events=[_message("user", "Weekend gardening")],
+    )
+
+    assert callbacks.local_hashtag_fast_path(context) is not None
+    assert context.state["hashtag_engine"]["source"] == "local"
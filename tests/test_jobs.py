@@ -0,0 +1,157 @@
+import time
+import asyncio
+
+from common.jobs import (
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JOB_FAILED,
+    Job,
+    JobManager,
+    JobStore,
+)
+
+
+def _recording_task(log, durations):
+    async def run_task(message, context, session_id):
+        log.append(("start", message))
+        await asyncio.sleep(durations.get(message, 0.01))
+        log.append(("end", message))
+        status = "error" if message.startswith("fail") else "success"
+        return {"message": message, "session_id": session_id, "status": status}
+
+    return run_task
+
+
+async def _wait_for(manager, jobs, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while any(
+        manager.get(job.job_id).status not in (JOB_SUCCEEDED, JOB_FAILED)
+        for job in jobs
+    ):
+        assert time.monotonic() < deadline, "jobs did not finish in time"
+        await asyncio.sleep(0.01)
+
+
+def test_jobs_of_a_session_run_in_order():
+    log = []
+
+    async def scenario():
+        manager = JobManager(
+            _recording_task(log, {"first": 0.05}), JobStore(None, 100, 3600), workers=4
+        )
+        await manager.start()
+        jobs = [await manager.submit(m, {}, "s1") for m in ("first", "second", "fail")]
+        await _wait_for(manager, jobs)
+        await manager.stop()
+        return [manager.get(job.job_id) for job in jobs]
+
+    first, second, failed = asyncio.run(scenario())
+    assert log == [
+        ("start", "first"),
+        ("end", "first"),
+        ("start", "second"),
+        ("end", "second"),
+        ("start", "fail"),
+        ("end", "fail"),
+    ]
+    assert (first.status, second.status, failed.status) == (
+        JOB_SUCCEEDED,
+        JOB_SUCCEEDED,
+        JOB_FAILED,
+    )
+    assert first.result["message"] == "first" and first.attempts == 1
+
+
+def test_busy_session_does_not_starve_other_sessions():
+    log = []
+    durations = {"a1": 0.3, "a2": 0.3, "a3": 0.3, "b1": 0.05}
+
+    async def scenario():
+        manager = JobManager(
+            _recording_task(log, durations), JobStore(None, 100, 3600), workers=2
+        )
+        await manager.start()
+        session_a = [await manager.submit(m, {}, "a") for m in ("a1", "a2", "a3")]
+        started = time.monotonic()
+        session_b = await manager.submit("b1", {}, "b")
+        await _wait_for(manager, [session_b])
+        elapsed = time.monotonic() - started
+        await _wait_for(manager, session_a)
+        await manager.stop()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.25
+
+
+def test_webhook_delivery_does_not_hold_a_worker():
+    log = []
+
+    async def scenario():
+        manager = JobManager(
+            _recording_task(log, {}),
+            JobStore(None, 100, 3600),
+            workers=1,
+            webhook_url="http://webhook.invalid/jobs",
+        )
+        delivered = asyncio.Event()
+
+        async def slow_notify(job):
+            await asyncio.sleep(10)
+            delivered.set()
+
+        manager._notify = slow_notify
+        await manager.start()
+        jobs = [await manager.submit(m, {}, m) for m in ("one", "two")]
+        await _wait_for(manager, jobs, timeout=1.0)
+        pending = len(manager._notifications)
+        await manager.stop()
+        return pending, delivered.is_set(), len(manager._notifications)
+
+    pending, delivered, pending_after_stop = asyncio.run(scenario())
+    assert pending == 2 and not delivered and pending_after_stop == 0
+
+
+def test_store_resumes_unfinished_jobs(tmp_path):
+    async def scenario():
+        store = JobStore(str(tmp_path), 100, 3600)
+        done = Job(job_id="done", message="m", session_id="s", status=JOB_SUCCEEDED)
+        running = Job(job_id="running", message="m", session_id="s", status=JOB_RUNNING)
+        await store.save(done)
+        await store.save(running)
+
+        log = []
+        manager = JobManager(
+            _recording_task(log, {}), JobStore(str(tmp_path), 100, 3600), workers=1
+        )
+        await manager.start()
+        await _wait_for(manager, [running])
+        await manager.stop()
+        return manager, log
+
+    manager, log = asyncio.run(scenario())
+    assert log == [("start", "m"), ("end", "m")]
+    assert manager.get("running").status == JOB_SUCCEEDED
+    assert manager.get("running").attempts == 1
+    assert manager.get("done").status == JOB_SUCCEEDED
+
+
+def test_store_prunes_only_finished_jobs():
+    async def scenario():
+        store = JobStore(None, max_jobs=2, ttl_s=3600)
+        for index in range(3):
+            await store.save(
+                Job(
+                    job_id=f"done-{index}",
+                    message="m",
+                    session_id="s",
+                    status=JOB_SUCCEEDED,
+                )
+            )
+        await store.save(Job(job_id="queued", message="m", session_id="s"))
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.get("queued").status == JOB_QUEUED
+    assert store.get("done-0") is None and store.get("done-1") is None
+    assert store.get("done-2") is not None
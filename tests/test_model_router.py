@@ -0,0 +1,104 @@
+import os
+import asyncio
+
+import pytest
+
+# The linkedin_post_agent package loads the image tool, which checks its credentials
+# at import time
+for var in (
+    "GOOGLE_API_KEY",
+    "CLOUDINARY_CLOUD_NAME",
+    "CLOUDINARY_API_KEY",
+    "CLOUDINARY_API_SECRET",
+):
+    os.environ.setdefault(var, "test")
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from linkedin_post_agent import model_router  # noqa: E402
+from linkedin_post_agent.model_router import ModelRouter, RoutedLlm  # noqa: E402
+
+
+class FakeLlm(BaseLlm):
+    latency: float = 0.0
+    responses: int = 1
+    fail: bool = False
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream=False):
+        for _ in range(self.responses):
+            await asyncio.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError("model unavailable")
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=self.model)])
+            )
+
+
+@pytest.fixture
+def router(monkeypatch):
+    llms = {
+        "primary": FakeLlm(model="primary", latency=0.01, responses=2),
+        "fallback": FakeLlm(model="fallback"),
+        "broken": FakeLlm(model="broken", fail=True),
+    }
+    router = ModelRouter(
+        routes={
+            "story": {"model": "primary", "fallback": "fallback"},
+            "flaky": {"model": "broken", "fallback": "fallback"},
+        },
+        p95_ms=1000,
+        timeout_s=5,
+        max_error_rate=0.5,
+        min_samples=1,
+        window_s=60,
+        llm_factory=llms.__getitem__,
+    )
+    monkeypatch.setattr(model_router, "_model_router", router)
+    return router
+
+
+def _latency_samples(router, model):
+    return [latency for _, latency, _ in router.stats(model).samples]
+
+
+def test_time_spent_by_the_caller_is_not_model_latency(router):
+    llm = RoutedLlm(model="primary", phase="story", agent_name="story_agent")
+
+    async def consume():
+        async for _ in llm.generate_content_async(LlmRequest()):
+            # Tool calls and sub-agents run here while the generator is paused
+            await asyncio.sleep(0.2)
+
+    asyncio.run(consume())
+    (latency,) = _latency_samples(router, "primary")
+    assert 0.02 <= latency < 0.15
+
+
+def test_generator_closed_early_records_a_sample(router):
+    llm = RoutedLlm(model="primary", phase="story", agent_name="story_agent")
+
+    async def consume_first():
+        responses = llm.generate_content_async(LlmRequest())
+        await responses.__anext__()
+        await responses.aclose()
+
+    asyncio.run(consume_first())
+    assert router.stats("primary").summary()["samples"] == 1
+    assert router.stats("primary").samples[0][2] == "ok"
+
+
+def test_failover_records_the_error_and_tags_responses(router):
+    llm = RoutedLlm(model="broken", phase="flaky", agent_name="hashtag_agent")
+
+    async def consume():
+        return [response async for response in llm.generate_content_async(LlmRequest())]
+
+    (response,) = asyncio.run(consume())
+    assert response.custom_metadata["model_routing"]["model"] == "fallback"
+    assert response.custom_metadata["model_routing"]["reason"] == "failover after error"
+    assert router.stats("broken").summary()["error_rate"] == 1.0
+    assert router.stats("fallback").summary()["samples"] == 1
+
+    # The broken primary is now skipped up front
+    assert router.choose("flaky")[0] == "fallback"
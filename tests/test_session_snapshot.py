@@ -0,0 +1,225 @@
+import os
+import asyncio
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from common.session_snapshot import (
+    SessionSnapshotter,
+    SnapshotSessionService,
+    decode_artifact,
+    decode_snapshot,
+    encode_artifact,
+    encode_snapshot,
+)
+
+
+APP = "app"
+IMAGE = b"\x89PNG" + bytes(range(256)) * 4
+
+
+def _services(directory, interval_s=30.0):
+    session_service = SnapshotSessionService()
+    artifact_service = InMemoryArtifactService()
+    snapshotter = SessionSnapshotter(
+        directory=str(directory),
+        session_service=session_service,
+        artifact_service=artifact_service,
+        interval_s=interval_s,
+    )
+    session_service.snapshotter = snapshotter
+    return session_service, artifact_service, snapshotter
+
+
+async def _image_turn(session_service, artifact_service, user_id, session_id):
+    session = await session_service.create_session(
+        app_name=APP, user_id=user_id, session_id=session_id, state={"topic": "AI"}
+    )
+    for version in range(2):
+        await artifact_service.save_artifact(
+            app_name=APP,
+            user_id=user_id,
+            session_id=session_id,
+            filename="post.png",
+            artifact=types.Part.from_bytes(
+                data=IMAGE + bytes([version]), mime_type="image/png"
+            ),
+        )
+    await artifact_service.save_artifact(
+        app_name=APP,
+        user_id=user_id,
+        filename="user:profile.txt",
+        artifact=types.Part(text="Data engineer"),
+    )
+    await session_service.append_event(
+        session,
+        Event(
+            author="image_agent",
+            content=types.Content(
+                role="model", parts=[types.Part(text="Here is your image")]
+            ),
+            actions=EventActions(artifact_delta={"post.png": 1}),
+        ),
+    )
+
+
+def test_encode_decode_round_trip():
+    from google.adk.sessions import Session
+
+    session = Session(id="s1", app_name=APP, user_id="u1", state={"k": "v"})
+    data = encode_snapshot(session.model_dump_json().encode("utf-8"), ["post.png"])
+
+    restored, filenames = decode_snapshot(data)
+    assert restored.id == "s1" and restored.state == {"k": "v"}
+    assert filenames == ["post.png"]
+
+
+def test_artifacts_keep_inline_data_as_raw_bytes():
+    part = types.Part.from_bytes(data=IMAGE, mime_type="image/png")
+    data = encode_artifact(part)
+
+    assert IMAGE in data
+    assert len(data) < len(IMAGE) + 200
+    restored = decode_artifact(data)
+    assert restored.inline_data.data == IMAGE
+    assert restored.inline_data.mime_type == "image/png"
+    assert decode_artifact(encode_artifact(types.Part(text="hi"))).text == "hi"
+
+
+def test_snapshot_restore_round_trip_with_artifacts(tmp_path):
+    async def before_restart():
+        session_service, artifact_service, snapshotter = _services(tmp_path)
+        await _image_turn(session_service, artifact_service, "u1", "s1")
+        await _image_turn(session_service, artifact_service, "u1", "s2")
+        await snapshotter.snapshot()
+        return snapshotter.stats["last_sessions_written"]
+
+    async def after_restart():
+        session_service, artifact_service, snapshotter = _services(tmp_path)
+        snapshotter.restore_state()
+        assert artifact_service.artifacts == {}
+
+        session = await session_service.get_session(
+            app_name=APP, user_id="u1", session_id="s1"
+        )
+        await session_service.get_session(app_name=APP, user_id="u1", session_id="s2")
+
+        versions = await artifact_service.list_versions(
+            app_name=APP, user_id="u1", session_id="s1", filename="post.png"
+        )
+        latest = await artifact_service.load_artifact(
+            app_name=APP, user_id="u1", session_id="s1", filename="post.png"
+        )
+        user_versions = await artifact_service.list_versions(
+            app_name=APP, user_id="u1", filename="user:profile.txt"
+        )
+        keys = await artifact_service.list_artifact_keys(
+            app_name=APP, user_id="u1", session_id="s2"
+        )
+        return session, versions, latest, user_versions, keys, snapshotter.stats
+
+    assert asyncio.run(before_restart()) == 2
+    session, versions, latest, user_versions, keys, stats = asyncio.run(after_restart())
+
+    assert session.state["topic"] == "AI"
+    assert session.events[-1].actions.artifact_delta == {"post.png": 1}
+    assert versions == [0, 1]
+    assert latest.inline_data.data == IMAGE + bytes([1])
+    # Saved once per turn and shared by both sessions, restored without duplicates
+    assert user_versions == [0, 1]
+    assert keys == ["post.png", "user:profile.txt"]
+    assert stats["sessions_restored"] == 2
+
+
+def test_only_changed_sessions_are_written(tmp_path):
+    async def scenario():
+        session_service, artifact_service, snapshotter = _services(tmp_path)
+        await _image_turn(session_service, artifact_service, "u1", "s1")
+        await snapshotter.snapshot()
+        await snapshotter.snapshot()
+        return snapshotter.stats["last_sessions_written"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_artifact_versions_are_written_once(tmp_path):
+    async def scenario():
+        session_service, artifact_service, snapshotter = _services(tmp_path)
+        await _image_turn(session_service, artifact_service, "u1", "s1")
+        await snapshotter.snapshot()
+        first = snapshotter.stats["last_artifact_versions_written"]
+
+        # A new turn in the same session only adds the new image version
+        session = await session_service.get_session(
+            app_name=APP, user_id="u1", session_id="s1"
+        )
+        await artifact_service.save_artifact(
+            app_name=APP,
+            user_id="u1",
+            session_id="s1",
+            filename="post.png",
+            artifact=types.Part.from_bytes(data=IMAGE, mime_type="image/png"),
+        )
+        await session_service.append_event(
+            session,
+            Event(
+                author="image_agent",
+                actions=EventActions(artifact_delta={"post.png": 2}),
+            ),
+        )
+        await snapshotter.snapshot()
+        return first, snapshotter.stats
+
+    first, stats = asyncio.run(scenario())
+    assert first == 3
+    assert stats["last_sessions_written"] == 1
+    assert stats["last_artifact_versions_written"] == 1
+
+
+def test_list_sessions_restores_snapshots_of_every_user(tmp_path):
+    async def before_restart():
+        session_service, artifact_service, snapshotter = _services(tmp_path)
+        await _image_turn(session_service, artifact_service, "u1", "s1")
+        await _image_turn(session_service, artifact_service, "u2", "s2")
+        await snapshotter.snapshot()
+
+    async def after_restart():
+        session_service, _, _ = _services(tmp_path)
+        every_user = await session_service.list_sessions(app_name=APP)
+        one_user = await session_service.list_sessions(app_name=APP, user_id="u2")
+        return every_user, one_user
+
+    asyncio.run(before_restart())
+    every_user, one_user = asyncio.run(after_restart())
+    assert sorted(s.id for s in every_user.sessions) == ["s1", "s2"]
+    assert [s.id for s in one_user.sessions] == ["s2"]
+
+
+def test_stop_waits_for_periodic_snapshot(tmp_path):
+    async def scenario():
+        session_service, artifact_service, snapshotter = _services(
+            tmp_path, interval_s=0.01
+        )
+        snapshotter.start()
+        for index in range(20):
+            await _image_turn(session_service, artifact_service, "u1", f"s{index}")
+            await asyncio.sleep(0.005)
+        await snapshotter.stop()
+        return snapshotter
+
+    snapshotter = asyncio.run(scenario())
+    assert snapshotter.stats["snapshots"] > 1
+    written = [
+        filename
+        for _, _, filenames in os.walk(tmp_path)
+        for filename in filenames
+        if filename.endswith(".snap")
+    ]
+    assert len(written) == 20
+    assert not [
+        filename
+        for _, _, filenames in os.walk(tmp_path)
+        for filename in filenames
+        if filename.endswith(".tmp")
+    ]